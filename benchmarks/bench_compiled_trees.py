@@ -0,0 +1,63 @@
+# Compiled tree inference benchmark: accuracy difference, memory and latency vs the original models
+# CLI: python -m benchmarks.bench_compiled_trees
+
+import json
+import time
+
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.compiled_trees import compare_predictions, compile_trees
+from src.features import build_feature_pipeline
+from src.train import OUTPUT_VAR, build_model
+
+from .utils import make_synthetic_data, time_calls
+
+TREE_MODELS = ("random_forest", "xgboost", "lgb")
+TRAIN_ROWS = 20_000
+BATCH_ROWS = 10_000
+N_CALLS = 200
+
+
+def benchmark_model(model_name: str, X_train, y_train, X_test) -> dict:
+    """
+    Fit a model, compile it and compare both on held out rows.
+
+    Returns:
+        dict: compare_predictions report, single row latency summaries (ms) and batch scoring time (s)
+    """
+    model = build_model(model_name)
+    model.fit(X_train, y_train)
+    compiled = compile_trees(model)
+
+    results = compare_predictions(model, compiled, X_test)
+    results["single_row_original"] = time_calls(lambda: model.predict_proba(X_test[:1]), N_CALLS)
+    results["single_row_compiled"] = time_calls(lambda: compiled.predict_proba(X_test[:1]), N_CALLS)
+    for name, scorer in (("original", model), ("compiled", compiled)):
+        start = time.perf_counter()
+        scorer.predict_proba(X_test)
+        results[f"batch_{name}_s"] = time.perf_counter() - start
+    return results
+
+
+def run_benchmark(model_names: tuple = TREE_MODELS) -> dict[str, dict]:
+    """
+    Returns:
+        dict: One report per tree model of MODELS
+    """
+    data = make_synthetic_data(TRAIN_ROWS + BATCH_ROWS)
+    X, y = data.drop(columns=OUTPUT_VAR), data[OUTPUT_VAR].to_numpy()
+    cat_features = X.select_dtypes(include="object").columns.tolist()
+    num_features = [col for col in X if col not in cat_features]
+    feature_pipeline = build_feature_pipeline(
+        OneHotEncoder(handle_unknown="ignore"), StandardScaler(), cat_features, num_features
+    )
+    X_train = feature_pipeline.fit_transform(X.iloc[:TRAIN_ROWS])
+    X_test = feature_pipeline.transform(X.iloc[TRAIN_ROWS:])
+    return {
+        model_name: benchmark_model(model_name, X_train, y[:TRAIN_ROWS], X_test)
+        for model_name in model_names
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
@@ -0,0 +1,42 @@
+# Drift monitoring benchmark: monitor_drift wall time as the number of rows grows
+# CLI: python -m benchmarks.bench_drift
+
+import json
+import os
+import tempfile
+import time
+
+from src.drift import monitor_drift
+
+from .utils import make_synthetic_data
+
+ROW_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def run_benchmark(row_counts: tuple = ROW_COUNTS) -> list[dict]:
+    """
+    Time monitor_drift on reference/new samples of each size (CSV read included).
+
+    Returns:
+        list[dict]: Wall time (s) and rows per second for each size
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ref_path, new_path = os.path.join(tmp_dir, "ref.csv"), os.path.join(tmp_dir, "new.csv")
+        report_path = os.path.join(tmp_dir, "drift_report.json")
+        for n_rows in row_counts:
+            make_synthetic_data(n_rows, seed=1).drop(columns="churned").to_csv(ref_path, index=False)
+            make_synthetic_data(n_rows, seed=2).drop(columns="churned").to_csv(new_path, index=False)
+
+            if not results:
+                monitor_drift(ref_path, new_path, output_path=report_path)  # Warm up (lazy scipy import)
+
+            start = time.perf_counter()
+            monitor_drift(ref_path, new_path, output_path=report_path)
+            elapsed = time.perf_counter() - start
+            results.append({"rows": n_rows, "seconds": elapsed, "rows_per_second": 2 * n_rows / elapsed})
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
@@ -0,0 +1,61 @@
+# Added latency of the derived features (src/derived_features.py): transform alone and full feature pipelines
+# CLI: python -m benchmarks.bench_features
+
+import json
+import tempfile
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.compact_artifacts import export_compact_artifacts, load_compact_artifacts
+from src.derived_features import DERIVED_FEATURES, CompiledDerivedFeatures
+from src.features import build_feature_pipeline
+
+from .utils import make_synthetic_data, time_calls
+
+N_CALLS = 5_000
+BATCH_ROWS = 10_000
+CAT_FEATURES = ["plan_type", "contract_type", "autopay", "is_promo_user"]
+
+
+def run_benchmark(n_calls: int = N_CALLS, batch_rows: int = BATCH_ROWS) -> dict:
+    """
+    Time the feature pipelines with and without derived features, for one row and per row of a batch.
+
+    Returns:
+        dict: Latency summaries (ms) for one row, and per-row cost (us) of batches, per pipeline
+    """
+    data = make_synthetic_data(batch_rows)
+    X, y = data.drop(columns="churned"), data["churned"].to_numpy()
+    num_features = [col for col in X if col not in CAT_FEATURES]
+    row, row_columns = X.head(1), {col: X[col].to_numpy()[:1] for col in X}
+    batch_columns = {col: X[col].to_numpy() for col in X}
+
+    compiled = CompiledDerivedFeatures(DERIVED_FEATURES)
+    results = {
+        "derived_transform": {
+            "1_row": time_calls(lambda: compiled.transform(row_columns), n_calls),
+            "per_row_us": time_calls(lambda: compiled.transform(batch_columns), 20)["p50_ms"] * 1000 / batch_rows,
+        },
+        "pipelines": {},
+    }
+
+    for derived_features in (None, DERIVED_FEATURES):
+        feature_pipeline = build_feature_pipeline(
+            OneHotEncoder(handle_unknown="ignore"), StandardScaler(), CAT_FEATURES, num_features, derived_features
+        ).fit(X)
+        model = LogisticRegression(max_iter=1000).fit(feature_pipeline.transform(X), y)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_compact_artifacts(model, feature_pipeline, tmp_dir, git_sha="benchmark")
+            _, compact_pipeline, _ = load_compact_artifacts(tmp_dir)
+            results["pipelines"]["derived" if derived_features else "legacy"] = {
+                "sklearn_1_row": time_calls(lambda: feature_pipeline.transform(row), n_calls // 10),
+                "compact_1_row": time_calls(lambda: compact_pipeline.transform(row_columns), n_calls),
+                "sklearn_per_row_us": time_calls(lambda: feature_pipeline.transform(X), 10)["p50_ms"] * 1000 / batch_rows,
+                "compact_per_row_us": time_calls(lambda: compact_pipeline.transform(batch_columns), 20)["p50_ms"] * 1000 / batch_rows,
+            }
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
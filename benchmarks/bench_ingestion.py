@@ -0,0 +1,67 @@
+# Per-request parse and validate cost of /predict/ bodies: FastAPI/Pydantic path vs src/ingestion.py
+# CLI: python -m benchmarks.bench_ingestion
+
+import json
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from src.app import load_artifacts, to_pipeline_input
+from src.ingestion import json_loads
+from src.io_schemas import PredictModel
+from src.validation import validate_customers
+
+from .utils import make_synthetic_data, time_calls
+
+N_CALLS = 20_000
+BATCH_SIZES = (100, 1_000)
+
+
+def pydantic_ingestion(body: bytes) -> pd.DataFrame:
+    """Previous /predict/ path: json -> PredictModel -> jsonable_encoder -> DataFrame"""
+    return pd.DataFrame([jsonable_encoder(PredictModel.model_validate(json.loads(body)))])
+
+
+def fast_ingestion(body: bytes, feature_pipeline):
+    """Current /predict/ path: orjson -> precompiled checks -> typed columns"""
+    return to_pipeline_input(feature_pipeline, validate_customers(json_loads(body)))
+
+
+def run_benchmark(n_calls: int = N_CALLS, batch_sizes: tuple = BATCH_SIZES) -> dict:
+    """
+    Time parsing + validation of one request body (up to the feature pipeline input).
+
+    Returns:
+        dict: Latency summaries (ms) per request before/after, and per-customer cost of batches (us)
+    """
+    _, feature_pipeline = load_artifacts()
+    customers = make_synthetic_data(max(batch_sizes)).drop(columns="churned").to_dict(orient="records")
+    body = json.dumps(customers[0]).encode()
+
+    results = {
+        "pydantic": time_calls(lambda: pydantic_ingestion(body), n_calls),
+        "fast": time_calls(lambda: fast_ingestion(body, feature_pipeline), n_calls),
+        "batch": [],
+    }
+
+    for batch_size in batch_sizes:
+        batch_body = json.dumps(customers[:batch_size]).encode()
+        pydantic_batch = time_calls(
+            lambda: pd.DataFrame(
+                [jsonable_encoder(PredictModel.model_validate(customer)) for customer in json.loads(batch_body)]
+            ),
+            n_calls=20,
+        )
+        fast_batch = time_calls(lambda: validate_customers(json_loads(batch_body), batch=True), n_calls=20)
+        results["batch"].append(
+            {
+                "rows": batch_size,
+                "pydantic_per_row_us": pydantic_batch["p50_ms"] * 1000 / batch_size,
+                "fast_per_row_us": fast_batch["p50_ms"] * 1000 / batch_size,
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
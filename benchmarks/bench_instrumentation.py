@@ -0,0 +1,68 @@
+# Overhead of the serving instrumentation (src/instrumentation.py)
+# CLI: python -m benchmarks.bench_instrumentation
+
+import asyncio
+import json
+import time
+
+from src.instrumentation import InstrumentationMiddleware, ServingMetrics
+
+N_CALLS = 200_000
+
+
+def time_per_call_us(func, n_calls: int = N_CALLS) -> float:
+    """Average wall time of func() in microseconds"""
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        func()
+    return (time.perf_counter() - start) / n_calls * 1e6
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def call_asgi(app, n_calls: int) -> float:
+    scope = {"type": "http", "path": "/predict/"}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n_calls * 1e6
+
+
+def run_benchmark() -> dict[str, float]:
+    """
+    Measure the per-call cost of each instrumentation primitive.
+
+    Returns:
+        dict: Overheads in microseconds
+    """
+    metrics = ServingMetrics()
+    for stage in metrics.stages:
+        metrics.observe(stage, 0.001)
+
+    bare_us = asyncio.run(call_asgi(noop_app, N_CALLS))
+    instrumented_us = asyncio.run(call_asgi(InstrumentationMiddleware(noop_app, metrics), N_CALLS))
+    return {
+        "observe_us": time_per_call_us(lambda: metrics.observe("predict", 0.0042)),
+        "increment_us": time_per_call_us(lambda: metrics.increment("errors_total", stage="predict")),
+        "middleware_us": instrumented_us - bare_us,
+        "per_request_us": (
+            instrumented_us - bare_us
+            + 4 * time_per_call_us(lambda: metrics.observe("predict", 0.0042))
+        ),  # Middleware plus the 4 stage observations of /predict/
+        "summary_us": time_per_call_us(metrics.summary, n_calls=100),
+        "render_prometheus_us": time_per_call_us(lambda: metrics.render_prometheus("abc"), n_calls=100),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
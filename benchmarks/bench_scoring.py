@@ -0,0 +1,59 @@
+# Bulk scoring benchmark: src.score throughput as rows and worker processes grow
+# CLI: python -m benchmarks.bench_scoring
+
+import json
+import os
+import resource
+import tempfile
+
+from src.score import score_file
+
+from .utils import make_synthetic_data
+
+ROW_COUNTS = (100_000, 1_000_000)
+WORKER_COUNTS = tuple(dict.fromkeys((0, 2, os.cpu_count())))  # No pool, 2 processes, all CPUs
+
+
+def run_benchmark(row_counts: tuple = ROW_COUNTS, worker_counts: tuple = WORKER_COUNTS) -> list[dict]:
+    """
+    Score a synthetic parquet table (CSV if pyarrow is missing) with each number of workers.
+
+    max_rss_mb is the peak RSS of this process (reader and writer), which should not grow with rows.
+
+    Returns:
+        list[dict]: Wall time (s), rows per second and peak RSS for each size and worker count
+    """
+    try:
+        import pyarrow  # noqa: F401
+        extension = "parquet"
+    except ImportError:
+        extension = "csv"
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, f"customers.{extension}")
+        output_path = os.path.join(tmp_dir, f"scores.{extension}")
+        for n_rows in row_counts:
+            customers = make_synthetic_data(n_rows).drop(columns="churned")
+            if extension == "parquet":
+                customers.to_parquet(input_path, index=False)
+            else:
+                customers.to_csv(input_path, index=False)
+            del customers
+
+            for workers in worker_counts:
+                stats = score_file(input_path, output_path, workers=workers)
+                results.append(
+                    {
+                        "rows": n_rows,
+                        "workers": workers,
+                        "seconds": stats["seconds"],
+                        "rows_per_second": stats["rows_per_sec"],
+                        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10,
+                    }
+                )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
@@ -0,0 +1,131 @@
+# Serving benchmarks: load test against uvicorn-served src.app:app and model microbenchmarks
+# CLI: python -m benchmarks.bench_serving
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import joblib
+
+from .utils import make_synthetic_data, summarize_latencies, time_calls
+
+CONCURRENCY_LEVELS = (1, 4, 16, 64)
+REQUESTS_PER_LEVEL = 2000
+MICRO_CALLS = 200
+BATCH_SIZE = 1000
+SERVER_START_TIMEOUT_SECONDS = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, log_dir: str) -> subprocess.Popen:
+    """
+    Start uvicorn serving src.app:app on localhost and wait until /health/ answers.
+    """
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "PREDICTION_LOG_DIR": log_dir},
+    )
+    deadline = time.time() + SERVER_START_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health/").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def run_load(url: str, payloads: list[dict], concurrency: int, n_requests: int) -> dict[str, float]:
+    """
+    Send n_requests POST requests with `concurrency` requests in flight.
+
+    Returns:
+        dict: Throughput (req/s), error count and latency percentiles (ms)
+    """
+    latencies, errors = [], 0
+    next_request = iter(range(n_requests))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in next_request:
+            start = time.perf_counter()
+            response = await client.post(url, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "errors": errors,
+        "throughput_rps": n_requests / elapsed,
+        **summarize_latencies(latencies),
+    }
+
+
+def run_load_test(
+    concurrency_levels: tuple = CONCURRENCY_LEVELS,
+    requests_per_level: int = REQUESTS_PER_LEVEL,
+) -> list[dict]:
+    """
+    Load test /predict/ at several concurrency levels (localhost only, no network).
+
+    Returns:
+        list[dict]: One result per concurrency level
+    """
+    payloads = make_synthetic_data(1000).drop(columns="churned").to_dict(orient="records")
+    port = free_port()
+    with tempfile.TemporaryDirectory() as log_dir:
+        server = start_server(port, log_dir)
+        try:
+            url = f"http://127.0.0.1:{port}/predict/"
+            asyncio.run(run_load(url, payloads, concurrency=1, n_requests=50))  # Warm up
+            return [
+                asyncio.run(run_load(url, payloads, concurrency, requests_per_level))
+                for concurrency in concurrency_levels
+            ]
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def run_microbenchmarks(n_calls: int = MICRO_CALLS, batch_size: int = BATCH_SIZE) -> dict[str, dict]:
+    """
+    Time feature_pipeline.transform and the model call, for one row and for a batch.
+
+    Returns:
+        dict: Latency summaries (ms) per operation
+    """
+    churn_model = joblib.load("artifacts/model.pkl")
+    feature_pipeline = joblib.load("artifacts/feature_pipeline.pkl")
+    batch = make_synthetic_data(batch_size).drop(columns="churned")
+    row = batch.iloc[:1]
+    row_features, batch_features = feature_pipeline.transform(row), feature_pipeline.transform(batch)
+
+    return {
+        "transform_1_row": time_calls(lambda: feature_pipeline.transform(row), n_calls),
+        "predict_proba_1_row": time_calls(lambda: churn_model.predict_proba(row_features), n_calls),
+        f"transform_{batch_size}_rows": time_calls(lambda: feature_pipeline.transform(batch), n_calls // 10),
+        f"predict_proba_{batch_size}_rows": time_calls(lambda: churn_model.predict_proba(batch_features), n_calls // 10),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps({"micro": run_microbenchmarks(), "load": run_load_test()}, indent=4))
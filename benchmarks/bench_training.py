@@ -0,0 +1,49 @@
+# Training benchmark: wall time of each train() stage on synthetic data of increasing size
+# CLI: python -m benchmarks.bench_training
+
+import json
+import os
+import tempfile
+
+from src.profiling import StageProfiler
+from src.train import TRAINING_STAGES, ChurnModelTrainer
+
+from .utils import make_synthetic_data
+
+ROW_COUNTS = (10_000, 50_000)
+
+
+def time_training_stages(n_rows: int, model: str = "logistic_reg") -> dict[str, float]:
+    """
+    Run the training pipeline stage by stage on n_rows synthetic rows.
+
+    Returns:
+        dict: Wall time (s) per stage and in total
+    """
+    profiler = StageProfiler(trace_memory=False)  # tracemalloc would distort the timings
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = os.path.join(tmp_dir, "churn.csv")
+        make_synthetic_data(n_rows).to_csv(data_path, index=False)
+
+        with profiler.stage("load_data"):
+            model_trainer = ChurnModelTrainer(data_path, tmp_dir, model=model)
+        for stage in TRAINING_STAGES:
+            with profiler.stage(stage):
+                getattr(model_trainer, stage)()
+
+    report = profiler.report()
+    timings = {stage: record["wall_s"] for stage, record in report["stages"].items()}
+    timings["total"] = report["total"]["wall_s"]
+    return timings
+
+
+def run_benchmark(row_counts: tuple = ROW_COUNTS) -> list[dict]:
+    """
+    Returns:
+        list[dict]: Stage timings for each dataset size
+    """
+    return [{"rows": n_rows, **time_training_stages(n_rows)} for n_rows in row_counts]
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmark(), indent=4))
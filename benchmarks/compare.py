@@ -0,0 +1,82 @@
+# Compare two benchmark result files and flag regressions
+# CLI: python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json --tolerance 0.1
+
+import argparse
+import json
+import sys
+
+TOLERANCE = 0.10  # Relative change tolerated before flagging a regression
+# Metrics where higher is better, every other numeric leaf is a cost (time, latency)
+HIGHER_IS_BETTER = ("throughput_rps", "rows_per_second", "class_agreement")
+# Leaves describing the benchmark setup rather than results
+SETUP_KEYS = ("rows", "concurrency", "workers", "requests", "cpu_count", "errors")
+
+
+def flatten(results: dict | list, prefix: str = "") -> dict[str, float]:
+    """
+    Flatten nested results into {"serving.concurrency=16.p95_ms": 12.3, ...}.
+
+    List items are keyed by their setup values (rows, concurrency, workers) so that runs with
+    different sizes line up.
+    """
+    flat = {}
+    if isinstance(results, list):
+        for item in results:
+            setup = ",".join(f"{key}={item[key]}" for key in SETUP_KEYS[:3] if key in item)
+            flat.update(flatten(item, f"{prefix}{setup}."))
+    elif isinstance(results, dict):
+        for key, value in results.items():
+            if isinstance(value, (dict, list)):
+                flat.update(flatten(value, f"{prefix}{key}."))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in SETUP_KEYS:
+                flat[f"{prefix}{key}"] = float(value)
+    return flat
+
+
+def compare(old: dict, new: dict, tolerance: float = TOLERANCE) -> list[dict]:
+    """
+    Relative change of every metric present in both result files.
+
+    Returns:
+        list[dict]: metric, old, new, change and whether it is a regression
+    """
+    old_flat, new_flat = flatten(old), flatten(new)
+    rows = []
+    for metric in sorted(old_flat.keys() & new_flat.keys()):
+        if old_flat[metric] == 0:
+            continue
+        change = (new_flat[metric] - old_flat[metric]) / old_flat[metric]
+        worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+        rows.append(
+            {
+                "metric": metric,
+                "old": old_flat[metric],
+                "new": new_flat[metric],
+                "change": change,
+                "regression": worse > tolerance,
+            }
+        )
+    return rows
+
+
+def compare_cli():
+    """
+    Print the comparison table, exit with code 1 if any metric regressed
+    """
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("old", type=str)
+    parser.add_argument("new", type=str)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    with open(args.old) as f_old, open(args.new) as f_new:
+        rows = compare(json.load(f_old), json.load(f_new), args.tolerance)
+
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<60} {row['old']:>12.4f} {row['new']:>12.4f} {row['change']:>+8.1%} {flag}")
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    compare_cli()
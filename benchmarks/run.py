@@ -0,0 +1,100 @@
+# Benchmark suite runner: writes a JSON result file per commit for regression comparison
+# CLI: python -m benchmarks.run --out benchmarks/results/
+#      python -m benchmarks.compare benchmarks/results/<old_sha>.json benchmarks/results/<new_sha>.json
+
+import argparse
+import json
+import os
+import platform
+from datetime import datetime
+
+from src.metrics import compute_git_sha
+
+from . import bench_compiled_trees, bench_drift, bench_features, bench_ingestion, bench_instrumentation, bench_scoring, bench_serving, bench_training
+
+RESULTS_DIR = "benchmarks/results"
+SUITES = ("serving", "micro", "ingestion", "instrumentation", "training", "drift", "scoring", "compiled_trees", "features")
+QUICK_SETTINGS = {
+    "concurrency_levels": (1, 8),
+    "requests_per_level": 200,
+    "training_rows": (10_000,),
+    "drift_rows": (1_000, 10_000),
+    "scoring_rows": (100_000,),
+}
+
+
+def run_suites(suites: tuple = SUITES, quick: bool = False) -> dict:
+    """
+    Run the selected benchmark suites.
+
+    Parameters
+    ----------
+    suites: tuple
+        Subset of SUITES
+    quick: bool
+        Smaller sizes (smoke run, e.g. on CI)
+
+    Returns:
+        dict: Metadata and one entry per suite
+    """
+    results = {
+        "git_sha": compute_git_sha(),
+        "timestamp": datetime.now().strftime("%d/%m/%Y, %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+    }
+    if "serving" in suites:
+        results["serving"] = bench_serving.run_load_test(
+            **(
+                {key: QUICK_SETTINGS[key] for key in ("concurrency_levels", "requests_per_level")}
+                if quick else {}
+            )
+        )
+    if "micro" in suites:
+        results["micro"] = bench_serving.run_microbenchmarks()
+    if "ingestion" in suites:
+        results["ingestion"] = bench_ingestion.run_benchmark()
+    if "instrumentation" in suites:
+        results["instrumentation"] = bench_instrumentation.run_benchmark()
+    if "training" in suites:
+        results["training"] = bench_training.run_benchmark(
+            *((QUICK_SETTINGS["training_rows"],) if quick else ())
+        )
+    if "drift" in suites:
+        results["drift"] = bench_drift.run_benchmark(
+            *((QUICK_SETTINGS["drift_rows"],) if quick else ())
+        )
+    if "scoring" in suites:
+        results["scoring"] = bench_scoring.run_benchmark(
+            *((QUICK_SETTINGS["scoring_rows"],) if quick else ())
+        )
+    if "compiled_trees" in suites:
+        results["compiled_trees"] = bench_compiled_trees.run_benchmark()
+    if "features" in suites:
+        results["features"] = bench_features.run_benchmark()
+    return results
+
+
+def run_benchmarks_cli():
+    """
+    Run the benchmark suite and save the results as <git_sha>.json
+    """
+    parser = argparse.ArgumentParser(description="Run the churn model benchmark suite")
+    parser.add_argument("--out", type=str, default=RESULTS_DIR, help="Directory to save the JSON results")
+    parser.add_argument("--suites", type=str, default=",".join(SUITES), help=f"Comma separated subset of {SUITES}")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, for smoke runs")
+    args = parser.parse_args()
+
+    results = run_suites(tuple(args.suites.split(",")), quick=args.quick)
+
+    os.makedirs(args.out, exist_ok=True)
+    output_path = os.path.join(args.out, f"{results['git_sha'][:12]}.json")
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Benchmark results saved in {output_path}")
+
+
+if __name__ == "__main__":
+    run_benchmarks_cli()
@@ -0,0 +1,78 @@
+# Shared helpers for the benchmark suite: synthetic data and timing
+
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = "data/customer_churn_synth.csv"
+NUMERIC_NOISE = 0.05  # Relative noise added to resampled numeric columns
+RANDOM_SEED = 42
+
+
+def make_synthetic_data(n_rows: int, data_path: str = DATA_PATH, seed: int = RANDOM_SEED) -> pd.DataFrame:
+    """
+    Scale the churn dataset to n_rows by resampling rows and jittering numeric columns.
+
+    Integer columns stay integers and non-negative, so the data keeps the PredictModel schema.
+
+    Parameters
+    ----------
+    n_rows: int
+        Number of rows to generate
+    data_path: str
+        Seed dataset
+    seed: int
+        Random seed, results are reproducible
+
+    Returns:
+        pd.DataFrame: Synthetic dataset with the same columns as data_path
+    """
+    rng = np.random.default_rng(seed)
+    data = pd.read_csv(data_path)
+    sample = data.iloc[rng.integers(0, len(data), n_rows)].reset_index(drop=True)
+
+    for column in sample.select_dtypes("number").columns:
+        if column == "churned":
+            continue
+        values = sample[column].to_numpy(dtype=np.float64)
+        jittered = np.clip(values * (1 + rng.normal(0, NUMERIC_NOISE, n_rows)), 0, None)
+        if pd.api.types.is_integer_dtype(sample[column]):
+            jittered = np.round(jittered).astype(np.int64)
+        sample[column] = jittered
+    return sample
+
+
+def summarize_latencies(latencies_s: list[float] | np.ndarray) -> dict[str, float]:
+    """
+    p50/p95/p99 and mean of a list of latencies.
+
+    Returns:
+        dict: Latencies in milliseconds
+    """
+    latencies_ms = np.asarray(latencies_s, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+def time_calls(func: Callable, n_calls: int, warmup: int = 5) -> dict[str, float]:
+    """
+    Call func n_calls times and summarize the latency of each call.
+
+    Returns:
+        dict: Latency summary (ms), see summarize_latencies
+    """
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return summarize_latencies(latencies)
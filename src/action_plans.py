@@ -0,0 +1,253 @@
+# Action plans emitted by the AI monitor (shared by the API and the agent tools)
+# Plans are persisted in an append-only SQLite (WAL) store, written in batches by a background thread
+
+import os
+import sys
+import json
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .io_schemas import ActionPlanModel
+
+ACTION_PLAN_STORE_PATH = os.environ.get("ACTION_PLAN_STORE_PATH", "artifacts/action_plans.sqlite")
+WRITE_BATCH_SIZE = 512  # Max plans per transaction
+DEFAULT_PAGE_SIZE = 50
+FLUSH_TIMEOUT_SECONDS = 10.0  # Reads wait at most this long for pending writes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS action_plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    status TEXT NOT NULL,
+    page_oncall INTEGER NOT NULL,
+    plan TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS action_plans_status ON action_plans (status);
+CREATE INDEX IF NOT EXISTS action_plans_ts ON action_plans (ts);
+CREATE TRIGGER IF NOT EXISTS action_plans_no_update BEFORE UPDATE ON action_plans
+BEGIN SELECT RAISE(ABORT, 'action_plans is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS action_plans_no_delete BEFORE DELETE ON action_plans
+BEGIN SELECT RAISE(ABORT, 'action_plans is append-only'); END;
+"""
+
+
+def to_epoch(timestamp: Optional[datetime]) -> Optional[float]:
+    """Convert a datetime (naive ones are taken as UTC) to epoch seconds"""
+    if timestamp is None:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class ActionPlanStore:
+    """
+    Append-only store of action plans.
+
+    Writes are queued and committed in batches by a single writer thread, so that high-frequency
+    monitors do not contend on the SQLite write lock. Reads flush pending writes first.
+    """
+
+    def __init__(self, path: str = ACTION_PLAN_STORE_PATH, batch_size: int = WRITE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        self._readers = threading.local()
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="action-plan-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, avoids an fsync per commit
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        # One connection per thread (FastAPI runs sync endpoints in a thread pool)
+        if not hasattr(self._readers, "connection"):
+            self._readers.connection = self._connect()
+        return self._readers.connection
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [item for item in batch if isinstance(item, tuple)]
+            try:
+                if rows:
+                    connection.executemany(
+                        "INSERT INTO action_plans (ts, status, page_oncall, plan) VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+                    connection.commit()
+            except sqlite3.Error as e:  # Database locked, disk full, ...: drop this batch, keep the writer alive
+                print(f"Action plans not stored ({e!r}), {len(rows)} plans dropped", file=sys.stderr)
+                try:
+                    connection.rollback()
+                except sqlite3.Error:
+                    pass
+            finally:
+                # Non-row items are flush markers (Events) or the stop signal (None)
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+            if None in batch:
+                connection.close()
+                return
+
+    def append(self, action_plan: ActionPlanModel) -> None:
+        """
+        Queue an action plan for writing. Timestamped when received.
+
+        Parameters
+        ----------
+        action_plan: ActionPlanModel
+            Validated action plan
+
+        Returns:
+            None
+        """
+        self._queue.put(
+            (
+                time.time(),
+                action_plan.status,
+                int(bool(action_plan.page_oncall)),
+                action_plan.model_dump_json(),
+            )
+        )
+
+    def flush(self, timeout: Optional[float] = FLUSH_TIMEOUT_SECONDS) -> bool:
+        """
+        Block until every plan queued before this call is committed (or failed to be).
+
+        Returns:
+            bool: False if the writer is not running or did not catch up within timeout seconds
+        """
+        if not self._writer.is_alive():
+            return False
+        committed = threading.Event()
+        self._queue.put(committed)
+        return committed.wait(timeout)
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[int] = None,
+    ) -> dict:
+        """
+        Fetch a page of action plans, newest first.
+
+        Pagination is keyset based: pass the returned next_cursor to get the following page.
+        Pending writes are flushed first (waiting at most FLUSH_TIMEOUT_SECONDS).
+
+        Parameters
+        ----------
+        status: Optional[str]
+            Keep only plans with this status (healthy, warn, critical)
+        since: Optional[datetime]
+            Keep only plans received at or after this time
+        until: Optional[datetime]
+            Keep only plans received before this time
+        limit: int
+            Page size
+        cursor: Optional[int]
+            Return plans older than this id
+
+        Returns:
+            dict: {"items": [ActionPlanModel fields + id and ts], "next_cursor": Optional[int]}
+        """
+        self.flush()
+
+        conditions, params = [], []
+        for condition, value in (
+            ("status = ?", status),
+            ("ts >= ?", to_epoch(since)),
+            ("ts < ?", to_epoch(until)),
+            ("id < ?", cursor),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = self._reader().execute(
+            f"SELECT id, ts, plan FROM action_plans {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+        items = [
+            {
+                "id": plan_id,
+                "ts": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+                **json.loads(plan),
+            }
+            for plan_id, ts, plan in rows[:limit]
+        ]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def close(self) -> None:
+        """Commit pending plans and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+
+@lru_cache(maxsize=1)
+def get_action_plan_store() -> ActionPlanStore:
+    """
+    Default store, opened on first use.
+
+    Returns:
+        ActionPlanStore: Store located at ACTION_PLAN_STORE_PATH
+    """
+    store = ActionPlanStore(ACTION_PLAN_STORE_PATH)
+    atexit.register(store.close)  # Do not lose queued plans on shutdown
+    return store
+
+
+def save_action_plan(
+    action_plan: ActionPlanModel | dict,
+    store: Optional[ActionPlanStore] = None,
+) -> ActionPlanModel:
+    """
+    Validate an action plan and append it to the action plan store.
+
+    Kept free of FastAPI and model artifacts so that the agent can post plans without booting the API.
+
+    Parameters
+    ----------
+    action_plan: ActionPlanModel | dict
+        Dictionary with the model status, findings and actions to take
+    store: Optional[ActionPlanStore]
+        Store to write to, defaults to get_action_plan_store()
+
+    Returns:
+        ActionPlanModel: Validated action plan
+    """
+    action_plan = ActionPlanModel.model_validate(action_plan)
+    store = get_action_plan_store() if store is None else store
+    store.append(action_plan)
+    return action_plan
@@ -0,0 +1,201 @@
+# Persistent cache for the AI monitor: reuse action plans when the agent inputs did not change
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+AGENT_CACHE_PATH = "artifacts/agent_cache.sqlite"
+AGENT_CACHE_TTL_SECONDS = 24 * 60 * 60  # Scheduled runs are hourly/daily, one day is enough
+AGENT_CACHE_MAX_ENTRIES = 256
+FLOAT_DECIMALS = 3  # Metrics and drift probs are reported with 3 decimals, smaller changes are noise
+
+
+def normalize_payload(payload: Any, decimals: int = FLOAT_DECIMALS) -> Any:
+    """
+    Normalize agent inputs so that meaningless changes do not invalidate the cache.
+
+    Floats are rounded and dictionaries are sorted by key (recursively).
+
+    Parameters
+    ----------
+    payload: Any
+        JSON-like object (dict, list, str, int, float, bool or None)
+    decimals: int
+        Number of decimals to keep for floats
+
+    Returns:
+        Any: Normalized payload
+
+    Example:
+        >>> normalize_payload({"b": 0.91234, "a": [1, 0.1000001]})
+        {'a': [1, 0.1], 'b': 0.912}
+    """
+    if isinstance(payload, dict):
+        return {
+            str(key): normalize_payload(value, decimals)
+            for key, value in sorted(payload.items(), key=lambda item: str(item[0]))
+        }
+    if isinstance(payload, (list, tuple)):
+        return [normalize_payload(value, decimals) for value in payload]
+    if isinstance(payload, float):
+        return round(payload, decimals)
+    return payload
+
+
+def compute_cache_key(system_prompt: str, inputs: dict, model_name: str) -> str:
+    """
+    Hash the system prompt, the normalized agent inputs and the LLM name.
+
+    Parameters
+    ----------
+    system_prompt: str
+        System message sent to the LLM
+    inputs: dict
+        Agent inputs (user query, metrics history, drift report, ...)
+    model_name: str
+        LLM identifier, e.g. gpt-4o
+
+    Returns:
+        str: sha256 hex digest
+    """
+    digest_input = json.dumps(
+        {
+            "system_prompt": system_prompt,
+            "inputs": normalize_payload(inputs),
+            "model_name": model_name,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(digest_input.encode("utf-8")).hexdigest()
+
+
+class AgentCache:
+    """
+    SQLite cache of agent results (action plan and side effect tool calls) with TTL and size eviction.
+    """
+
+    def __init__(
+        self,
+        path: str = AGENT_CACHE_PATH,
+        ttl_seconds: float = AGENT_CACHE_TTL_SECONDS,
+        max_entries: int = AGENT_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                action_plan TEXT NOT NULL,
+                tool_calls TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0);
+            """
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached agent result. Expired entries count as misses.
+
+        Parameters
+        ----------
+        key: str
+            Cache key, see compute_cache_key
+
+        Returns:
+            Optional[dict]: {"action_plan": dict, "tool_calls": list} or None on a miss
+        """
+        now = time.time()
+        row = self.connection.execute(
+            "SELECT action_plan, tool_calls FROM entries WHERE key = ? AND created_at >= ?",
+            (key, now - self.ttl_seconds),
+        ).fetchone()
+
+        counter = "hits" if row is not None else "misses"
+        self.connection.execute(
+            "UPDATE counters SET value = value + 1 WHERE name = ?", (counter,)
+        )
+        if row is not None:
+            self.connection.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+        self.connection.commit()
+
+        if row is None:
+            return None
+        action_plan, tool_calls = row
+        return {"action_plan": json.loads(action_plan), "tool_calls": json.loads(tool_calls)}
+
+    def put(self, key: str, action_plan: dict, tool_calls: list) -> None:
+        """
+        Store an agent result and evict expired/least recently used entries.
+
+        Parameters
+        ----------
+        key: str
+            Cache key, see compute_cache_key
+        action_plan: dict
+            Action plan emitted by the agent (ActionPlanModel as dict)
+        tool_calls: list
+            Side effect tool calls [{"name": str, "args": dict}] to replay on a hit
+
+        Returns:
+            None
+        """
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries (key, created_at, last_access, action_plan, tool_calls) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, now, now, json.dumps(action_plan), json.dumps(tool_calls)),
+        )
+        self.evict(now)
+        self.connection.commit()
+
+    def evict(self, now: Optional[float] = None) -> None:
+        """
+        Remove expired entries, then the least recently used ones above max_entries.
+        """
+        now = time.time() if now is None else now
+        self.connection.execute(
+            "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self.connection.execute(
+            "DELETE FROM entries WHERE key NOT IN "
+            "(SELECT key FROM entries ORDER BY last_access DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict[str, float]:
+        """
+        Cache hit-rate metric (lifetime of the cache file).
+
+        Returns:
+            dict: hits, misses, hit_rate and number of entries
+        """
+        counters = dict(self.connection.execute("SELECT name, value FROM counters"))
+        (entries,) = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        self.connection.close()
@@ -1,23 +1,24 @@
 # CLI: python -m src.agent_monitor --metrics data/metrics_history.jsonl --drift data/drift_latest.json --out artifacts/agent_plan.yaml
 
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langfuse.langchain import CallbackHandler
-
 from src.agent_tools import json_reader, json_saver, action_plan_poster, yaml_saver
+from src.agent_cache import AgentCache, compute_cache_key, AGENT_CACHE_PATH, AGENT_CACHE_TTL_SECONDS
 from src.io_schemas import ActionPlanModel
 
 import argparse
 import time
+from functools import lru_cache
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llmops_callback_handler = CallbackHandler()
-
-llm = ChatOpenAI(model="gpt-4o", temperature=0.0)
+LLM_MODEL = "gpt-4o"
 tools = [yaml_saver, json_reader, json_saver, action_plan_poster]
+side_effect_tools = {
+    "yaml_saver": yaml_saver,
+    "json_saver": json_saver,
+    "action_plan_poster": action_plan_poster,
+}  # Tools replayed on a cache hit (json_reader has no side effects)
 system_message = """
 ### Machine Learning Expert with focus on Data Drift
 
@@ -80,16 +81,100 @@ points.
  - Post it using the action_plan_poster tool
 """.strip()
 
-react_agent = create_react_agent(llm, tools)
+
+@lru_cache(maxsize=1)
+def build_react_agent() -> tuple:
+    """
+    Build the ReAct agent and its Langfuse callback handler on the first LLM call.
+
+    langgraph, langchain and langfuse are imported here (not at module level) so that importing this
+    module and serving cache hits need neither the LLM stack nor the OpenAI/Langfuse credentials.
+
+    Returns:
+        tuple: (ReAct agent, Langfuse callback handler)
+    """
+    from langchain_openai import ChatOpenAI
+    from langfuse.langchain import CallbackHandler
+    from langgraph.prebuilt import create_react_agent
+
+    llm = ChatOpenAI(model=LLM_MODEL, temperature=0.0)
+    return create_react_agent(llm, tools), CallbackHandler()
+
+
+def extract_tool_calls(messages: list) -> list[dict]:
+    """
+    Collect the side effect tool calls (name and args) made by the agent, in order.
+
+    Only calls whose tool result succeeded are kept: a call that raised (ToolMessage with status
+    "error") or got no result must not be replayed on a cache hit.
+
+    Parameters
+    ----------
+    messages: list
+        Messages returned by the ReAct agent
+
+    Returns:
+        list[dict]: [{"name": str, "args": dict}, ...]
+    """
+    succeeded_ids = {
+        message.tool_call_id
+        for message in messages
+        if getattr(message, "tool_call_id", None) is not None and getattr(message, "status", "success") != "error"
+    }
+    return [
+        {"name": tool_call["name"], "args": tool_call["args"]}
+        for message in messages
+        for tool_call in (getattr(message, "tool_calls", None) or [])
+        if tool_call["name"] in side_effect_tools and tool_call.get("id") in succeeded_ids
+    ]
+
+
+def extract_action_plan(tool_calls: list[dict]) -> Optional[ActionPlanModel]:
+    """
+    Recover the action plan from the arguments of the last posting/saving tool call.
+
+    Parameters
+    ----------
+    tool_calls: list[dict]
+        Side effect tool calls, see extract_tool_calls
+
+    Returns:
+        Optional[ActionPlanModel]: Action plan or None if the agent did not emit a valid one
+    """
+    for tool_call in reversed(tool_calls):
+        args = tool_call["args"]
+        candidate = args.get("action_plan", args.get("data"))
+        try:
+            return ActionPlanModel.model_validate(candidate)
+        except Exception:
+            continue
+    return None
+
+
+def replay_tool_calls(tool_calls: list[dict]) -> None:
+    """
+    Re-run the side effects (save YAML/JSON, post action plan) of a cached agent run.
+    """
+    for tool_call in tool_calls:
+        side_effect_tools[tool_call["name"]](**tool_call["args"])
 
 
 # Build ReAct Agent
-def run_react_agent(metrics_path: str, drift_path: str, agent_plan_path: str) -> None:
+def run_react_agent(
+    metrics_path: str,
+    drift_path: str,
+    agent_plan_path: str,
+    cache: Optional[AgentCache] = None,
+) -> Optional[ActionPlanModel]:
     """
     Run Agentic AI ML Monitor
 
+    If a cache is given and the inputs (system prompt, metrics, drift report and LLM) did not change
+    since a previous run, the stored action plan is returned and its side effects are replayed
+    without calling the LLM.
+
     Returns:
-        None: Results are saved in the /monitor path of the API
+        Optional[ActionPlanModel]: Action plan. Results are also saved in the /monitor path of the API
     """
     user_query = f"""
     Analyse model quality
@@ -100,12 +185,36 @@ def run_react_agent(metrics_path: str, drift_path: str, agent_plan_path: str) ->
         
     Save the agent plan in {agent_plan_path}"""
 
+    if cache is not None:
+        cache_key = compute_cache_key(
+            system_message,
+            {
+                "user_query": user_query,
+                "metrics": json_reader(metrics_path),
+                "drift": json_reader(drift_path),
+            },
+            LLM_MODEL,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            replay_tool_calls(cached["tool_calls"])
+            return ActionPlanModel.model_validate(cached["action_plan"])
+
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    react_agent, llmops_callback_handler = build_react_agent()
     time.sleep(60)  # Avoid TPM error
-    react_agent.invoke(
+    result = react_agent.invoke(
         input={"messages": [SystemMessage(system_message), HumanMessage(user_query)]},
         config={"callbacks": [llmops_callback_handler]}
     )
 
+    tool_calls = extract_tool_calls(result["messages"])
+    action_plan = extract_action_plan(tool_calls)
+    if cache is not None and action_plan is not None:
+        cache.put(cache_key, action_plan.model_dump(), tool_calls)
+    return action_plan
+
 
 def run_agent_monitor_cli():
     """
@@ -116,12 +225,20 @@ def run_agent_monitor_cli():
     parser.add_argument("--metrics", type=str, required=True)
     parser.add_argument("--drift", type=str, required=True)
     parser.add_argument("--out", type=str, required=True)
+    parser.add_argument("--cache-path", type=str, default=AGENT_CACHE_PATH, help="Path to the agent cache (SQLite)")
+    parser.add_argument("--cache-ttl", type=float, default=AGENT_CACHE_TTL_SECONDS, help="Cache TTL in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the LLM")
 
     args = parser.parse_args()
     metrics_path, drift_path, agent_plan_path = (args.metrics, args.drift, args.out)
+    cache = None if args.no_cache else AgentCache(args.cache_path, ttl_seconds=args.cache_ttl)
 
     # Run Agent
-    run_react_agent(metrics_path, drift_path, agent_plan_path)
+    run_react_agent(metrics_path, drift_path, agent_plan_path, cache=cache)
+
+    if cache is not None:
+        print(f"Agent cache stats: {cache.stats()}")
+        cache.close()
 
 
 if __name__ == "__main__":
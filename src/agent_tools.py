@@ -2,7 +2,7 @@ import yaml
 import json
 from pathlib import Path
 from src.io_schemas import ActionPlanModel
-from src.app import post_action_plan
+from src.action_plans import save_action_plan
 
 
 
@@ -124,4 +124,4 @@ def action_plan_poster(action_plan: ActionPlanModel) -> dict:
             "actions": ["do_nothing"],
         })
     """
-    return post_action_plan(action_plan)
+    return save_action_plan(action_plan).model_dump()
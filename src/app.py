@@ -1,21 +1,120 @@
 # Endpoints: GET /health, POST /predict
 
-from fastapi import FastAPI, HTTPException
-from fastapi.encoders import jsonable_encoder
-from .io_schemas import PredictModel, ActionPlanModel
-import joblib
+import os
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Literal, Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from .io_schemas import ActionPlanModel, ActionPlanPage
+from .action_plans import ActionPlanStore, get_action_plan_store, save_action_plan
+from .prediction_log import PredictionLogger, get_prediction_logger
+from .instrumentation import InstrumentationMiddleware, ServingMetrics
+from .compact_artifacts import MANIFEST_FILENAME, CompactFeaturePipeline, load_compact_artifacts
+from .compiled_trees import COMPILERS, compile_trees
+from .ingestion import add_predict_model_schema, parse_customer, parse_customers, request_body_openapi
+import numpy as np
 import pandas as pd
 
-# Get churn model
+MODEL_PATH = "artifacts/model.pkl"
+FEATURE_PIPELINE_PATH = "artifacts/feature_pipeline.pkl"
+METRICS_PATH = "artifacts/metrics.json"
+COMPACT_ARTIFACTS_DIR = "artifacts/compact"
+ARTIFACT_FORMAT = os.environ.get("CHURN_ARTIFACT_FORMAT", "auto")  # auto (compact if exported), compact or joblib
+# exact: model as trained, compiled: tree ensembles scored by src/compiled_trees.py (float32 thresholds)
+INFERENCE_MODE = os.environ.get("CHURN_INFERENCE_MODE", "exact")
 
-churn_model = joblib.load("artifacts/model.pkl")
-feature_pipeline = joblib.load("artifacts/feature_pipeline.pkl")
 
-app = FastAPI()
+def use_compact_artifacts() -> bool:
+    """Whether the compact artifacts are served instead of the pickles"""
+    if ARTIFACT_FORMAT == "auto":
+        return os.path.isfile(os.path.join(COMPACT_ARTIFACTS_DIR, MANIFEST_FILENAME))
+    return ARTIFACT_FORMAT == "compact"
+
+
+@lru_cache(maxsize=1)
+def load_artifacts() -> tuple:
+    """
+    Load the churn model and feature pipeline once, on first use.
+
+    Importing this module stays cheap (no unpickling, no sklearn import); the artifacts are loaded
+    at server startup or by the first request, whichever comes first. The compact format
+    (memory-mapped arrays, checksums verified) is preferred over the joblib pickles. With
+    CHURN_INFERENCE_MODE=compiled, tree ensembles (pickled or compact) are served as flat node
+    arrays with float32 leaves.
+
+    Returns:
+        tuple: (churn_model, feature_pipeline)
+    """
+    if use_compact_artifacts():
+        churn_model, feature_pipeline, _ = load_compact_artifacts(COMPACT_ARTIFACTS_DIR)
+        if INFERENCE_MODE == "compiled" and churn_model.trees is not None:
+            churn_model = churn_model.compiled()
+        return churn_model, feature_pipeline
+
+    import joblib
+
+    churn_model = joblib.load(MODEL_PATH)
+    feature_pipeline = joblib.load(FEATURE_PIPELINE_PATH)
+    if INFERENCE_MODE == "compiled" and type(churn_model).__name__ in COMPILERS:
+        churn_model = compile_trees(churn_model)
+    return churn_model, feature_pipeline
+
+
+@lru_cache(maxsize=1)
+def load_model_version() -> str:
+    """
+    Version of the served model: git SHA of the commit it was trained on (see manifest.json or metrics.json).
+
+    Returns:
+        str: git sha or "N/A"
+    """
+    path = os.path.join(COMPACT_ARTIFACTS_DIR, MANIFEST_FILENAME) if use_compact_artifacts() else METRICS_PATH
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("git_sha", "N/A")
+    except (OSError, ValueError):
+        return "N/A"
+
+
+def to_pipeline_input(feature_pipeline, columns: dict[str, np.ndarray]):
+    """Customer columns as the feature pipeline expects them (compact: columns as is, sklearn: DataFrame)"""
+    return columns if isinstance(feature_pipeline, CompactFeaturePipeline) else pd.DataFrame(columns)
+
+
+def get_served_prediction_logger() -> PredictionLogger:
+    """Prediction logger tagged with the served model version"""
+    return get_prediction_logger(load_model_version())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_artifacts()  # Warm up before serving traffic
+    yield
+
+
+serving_metrics = ServingMetrics()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(InstrumentationMiddleware, metrics=serving_metrics)
+default_openapi = app.openapi
+
+
+def openapi() -> dict:
+    """OpenAPI schema, with PredictModel documented for the /predict/ bodies parsed by src/ingestion.py"""
+    if app.openapi_schema is None:
+        add_predict_model_schema(default_openapi())
+    return app.openapi_schema
+
+
+app.openapi = openapi
 
 
 @app.get("/health/") 
-def get_health() -> dict[str, str]:
+def get_health() -> dict:
     """
     Path Operation to monitor churn model performance.
 
@@ -24,39 +123,176 @@ def get_health() -> dict[str, str]:
     None
     
     Returns:
-        dict: Status Code
+        dict: Status Code and rolling p50/p95/p99 latency (ms) of each stage, per route (/predict/, /predict/batch/)
+    """
+    return {"status":"ok", "latency_ms": serving_metrics.summary()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """
+    Path Operation exposing serving metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Stage latency histograms, request and error counters, labeled with the model version
     """
-    return {"status":"ok"}
+    return PlainTextResponse(
+        serving_metrics.render_prometheus(load_model_version()),
+        media_type="text/plain; version=0.0.4",
+    )
 
 
-@app.post("/predict/")
-def post_predict(customer_data: PredictModel):
+@app.post("/predict/", openapi_extra=request_body_openapi())
+def post_predict(
+    request: Request,
+    customer_data: dict = Depends(parse_customer),
+    x_request_id: Optional[str] = Header(default=None),
+    prediction_logger: PredictionLogger = Depends(get_served_prediction_logger),
+):
     """
     Path Operation to consume Churn model and predict.
 
+    Every prediction (and failure) is logged asynchronously with its request id and latency, so
+    that churn labels can be joined later (see src/label_join.py). Stage latencies are recorded
+    in serving_metrics (see /metrics).
+
     Parameters
     ----------
-    customer_data : PredictModel
-        Customer info used by the model to predict churn
+    request : Request
+        Incoming request, carries the start time set by InstrumentationMiddleware
+    customer_data : dict
+        Customer info used by the model to predict churn (PredictModel body, parsed into columns)
+    x_request_id : Optional[str]
+        Client provided request id (X-Request-ID header), generated if missing
+    prediction_logger : PredictionLogger
+        Served predictions log
     
     Returns:
-        dict: Churn category (0 = Not likely to churn, 1 = Likely to churn) and churn estimated probability
+        dict: Churn category (0 = Not likely to churn, 1 = Likely to churn), churn estimated probability
+        and the request id
     """
+    received_at, start = time.time(), time.perf_counter()
+    request_start = getattr(request.state, "request_start", start)
+    request_id = x_request_id or uuid.uuid4().hex
+    stage = "parse_validate"
     try:
-        customer_data = pd.DataFrame([jsonable_encoder(customer_data)])
+        churn_model, feature_pipeline = load_artifacts()
+        customer_data = to_pipeline_input(feature_pipeline, customer_data)
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - request_start, route="/predict/")
+
+        stage, stage_start = "transform", stage_end
         customer_data = feature_pipeline.transform(customer_data)
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - stage_start, route="/predict/")
+
+        stage, stage_start = "predict", stage_end
         churn_class = int(churn_model.predict(customer_data)[0])
         churn_likelihood = float(churn_model.predict_proba(customer_data)[0][1]  )
-        return {
-            "churn_class": churn_class,
-            "churn_likelihood": churn_likelihood,
-        }
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - stage_start, route="/predict/")
+
+        stage, stage_start = "serialize", stage_end
+        response = JSONResponse(
+            {
+                "churn_class": churn_class,
+                "churn_likelihood": churn_likelihood,
+                "request_id": request_id,
+            }
+        )
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - stage_start, route="/predict/")
     except Exception as e:
+        serving_metrics.increment("errors_total", stage=stage)
+        latency_ms = (time.perf_counter() - start) * 1000
+        prediction_logger.log(request_id, received_at, float("nan"), -1, latency_ms, error=True)
         raise HTTPException(status_code=400, detail=str(e))
-    
+
+    latency_ms = (stage_end - start) * 1000
+    prediction_logger.log(request_id, received_at, churn_likelihood, churn_class, latency_ms)
+    return response
+
+
+@app.post("/predict/batch/", openapi_extra=request_body_openapi(batch=True))
+def post_predict_batch(
+    request: Request,
+    customers: dict = Depends(parse_customers),
+    x_request_id: Optional[str] = Header(default=None),
+    prediction_logger: PredictionLogger = Depends(get_served_prediction_logger),
+):
+    """
+    Path Operation to predict churn for a list of customers in one call.
+
+    The JSON list is validated straight into NumPy columns and scored in a single vectorized
+    pass. Each customer gets its own request id in the prediction log.
+
+    Parameters
+    ----------
+    request : Request
+        Incoming request, carries the start time set by InstrumentationMiddleware
+    customers : dict
+        Customers info (list of PredictModel body, parsed into columns)
+    x_request_id : Optional[str]
+        Client provided id of the batch (X-Request-ID header), generated if missing
+    prediction_logger : PredictionLogger
+        Served predictions log
+
+    Returns:
+        dict: Churn categories, churn estimated probabilities and request ids (one per customer),
+        and the batch request id
+    """
+    received_at, start = time.time(), time.perf_counter()
+    request_start = getattr(request.state, "request_start", start)
+    request_id = x_request_id or uuid.uuid4().hex
+    n_customers = len(next(iter(customers.values())))  # At most MAX_BATCH_ROWS (checked by parse_customers)
+    request_ids = [uuid.uuid4().hex for _ in range(n_customers)]
+    stage = "parse_validate"
+    try:
+        churn_model, feature_pipeline = load_artifacts()
+        customers = to_pipeline_input(feature_pipeline, customers)
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - request_start, route="/predict/batch/")
+
+        stage, stage_start = "transform", stage_end
+        customers = feature_pipeline.transform(customers)
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - stage_start, route="/predict/batch/")
+
+        stage, stage_start = "predict", stage_end
+        churn_classes = churn_model.predict(customers).astype(int).tolist() if n_customers else []
+        churn_likelihoods = churn_model.predict_proba(customers)[:, 1].tolist() if n_customers else []
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - stage_start, route="/predict/batch/")
+
+        stage, stage_start = "serialize", stage_end
+        response = JSONResponse(
+            {
+                "churn_class": churn_classes,
+                "churn_likelihood": churn_likelihoods,
+                "request_ids": request_ids,
+                "request_id": request_id,
+            }
+        )
+        stage_end = time.perf_counter()
+        serving_metrics.observe(stage, stage_end - stage_start, route="/predict/batch/")
+    except Exception as e:
+        serving_metrics.increment("errors_total", stage=stage)
+        latency_ms = (time.perf_counter() - start) * 1000
+        for row_request_id in request_ids:
+            prediction_logger.log(row_request_id, received_at, float("nan"), -1, latency_ms, error=True)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    latency_ms = (stage_end - start) * 1000
+    for row_request_id, churn_class, churn_likelihood in zip(request_ids, churn_classes, churn_likelihoods):
+        prediction_logger.log(row_request_id, received_at, churn_likelihood, churn_class, latency_ms)
+    return response
+
 
 @app.post("/monitor")
-def post_action_plan(action_plan: ActionPlanModel):
+def post_action_plan(
+    action_plan: ActionPlanModel,
+    store: ActionPlanStore = Depends(get_action_plan_store),
+):
     """
     Path Operation to Save action plan based on drift analysis
 
@@ -64,8 +300,41 @@ def post_action_plan(action_plan: ActionPlanModel):
     ----------
     action_plan: ActionPlanModel
         Dictionary with the model status, findings and actions to take
+    store: ActionPlanStore
+        Action plan store (batched, append-only)
     
     Returns:
         dict: Action plan
     """
-    return action_plan
+    return save_action_plan(action_plan, store)
+
+
+@app.get("/monitor", response_model=ActionPlanPage)
+def get_action_plans(
+    status: Optional[Literal["healthy", "warn", "critical"]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    store: ActionPlanStore = Depends(get_action_plan_store),
+):
+    """
+    Path Operation to query the history of action plans, newest first.
+
+    Parameters
+    ----------
+    status: Optional[str]
+        Filter by status (healthy, warn, critical)
+    since, until: Optional[datetime]
+        Filter by reception time, naive datetimes are taken as UTC
+    limit: int
+        Page size
+    cursor: Optional[int]
+        next_cursor returned by the previous page
+    store: ActionPlanStore
+        Action plan store (batched, append-only)
+
+    Returns:
+        dict: Page of action plans and the cursor for the next one
+    """
+    return store.query(status=status, since=since, until=until, limit=limit, cursor=cursor)
@@ -0,0 +1,374 @@
+# Compact model artifacts: raw little-endian arrays + JSON manifest, loaded with np.memmap
+# Serving does not need to unpickle sklearn objects (fast cold start, no exact library version pinning)
+# CLI: python -m src.compact_artifacts --artifacts artifacts/
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from collections import ChainMap
+from datetime import datetime
+from typing import Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .compiled_trees import CompiledEnsemble, compile_trees
+from .derived_features import CompiledDerivedFeatures, DerivedFeature
+
+FORMAT_VERSION = 1
+COMPACT_DIRNAME = "compact"
+MANIFEST_FILENAME = "manifest.json"
+LINEAR_MODELS = ("LogisticRegression", "LogisticRegressionCV")
+FOREST_MODELS = ("RandomForestClassifier", "ExtraTreesClassifier")
+TREE_ARRAY_DTYPES = {
+    "feature": "<i2",
+    "threshold": "<f4",
+    "left": "<i4",
+    "right": "<i4",
+    "default_left": "|b1",
+    "value": "<f8",
+    "roots": "<i4",
+}
+
+Columns = Union[pd.DataFrame, Mapping[str, np.ndarray]]
+
+
+class ArrayWriter:
+    """Write arrays as raw little-endian files and describe them (dtype, shape, sha256) for the manifest"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.arrays: dict[str, dict] = {}
+
+    def write(self, name: str, array: np.ndarray, dtype: str) -> str:
+        array = np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder("<"))
+        filename = f"{name}.bin"
+        array.tofile(os.path.join(self.output_dir, filename))
+        self.arrays[name] = {
+            "file": filename,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": hashlib.sha256(array.tobytes()).hexdigest(),
+        }
+        return name
+
+
+def load_array(artifacts_dir: str, spec: dict, verify: bool = True) -> np.ndarray:
+    """
+    Memory-map an array described in the manifest, optionally checking its sha256.
+
+    Returns:
+        np.ndarray: Read-only array (np.memmap, or an empty array for 0-sized entries)
+    """
+    path = os.path.join(artifacts_dir, spec["file"])
+    shape = tuple(spec["shape"])
+    if int(np.prod(shape)) == 0:
+        array = np.empty(shape, dtype=spec["dtype"])
+    else:
+        array = np.memmap(path, dtype=spec["dtype"], mode="r", shape=shape)
+    if verify and hashlib.sha256(memoryview(np.ascontiguousarray(array)).cast("B")).hexdigest() != spec["sha256"]:
+        raise ValueError(f"Checksum mismatch for {path}, the artifact is corrupted")
+    return array
+
+
+# ----- Feature pipeline -----
+
+def export_feature_pipeline(feature_pipeline, writer: ArrayWriter) -> dict:
+    """
+    Describe a fitted ColumnTransformer made of OneHotEncoder(handle_unknown="ignore") and StandardScaler steps,
+    optionally preceded by DerivedFeatureTransformer steps (Pipeline from build_feature_pipeline).
+    """
+    derived = []
+    if type(feature_pipeline).__name__ == "Pipeline":
+        *derived_steps, (_, feature_pipeline) = feature_pipeline.steps
+        for _, transformer in derived_steps:
+            if type(transformer).__name__ != "DerivedFeatureTransformer":
+                raise ValueError(f"Unsupported feature pipeline step for compact export: {type(transformer).__name__}")
+            derived.extend(definition.to_dict() for definition in transformer.definitions)
+
+    steps = []
+    for name, transformer, columns in feature_pipeline.transformers_:
+        kind = type(transformer).__name__
+        if name == "remainder" and transformer == "drop":
+            continue
+        if kind == "OneHotEncoder":
+            if transformer.drop is not None or transformer.handle_unknown != "ignore":
+                raise ValueError("Only OneHotEncoder(handle_unknown='ignore', drop=None) is supported")
+            steps.append(
+                {
+                    "type": "one_hot",
+                    "columns": list(columns),
+                    "categories": [[str(category) for category in categories] for categories in transformer.categories_],
+                }
+            )
+        elif kind == "StandardScaler":
+            n_columns = len(columns)
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(n_columns)
+            scale = transformer.scale_ if transformer.with_std else np.ones(n_columns)
+            steps.append(
+                {
+                    "type": "standard_scaler",
+                    "columns": list(columns),
+                    "mean": writer.write(f"{name}_mean", mean, "<f8"),
+                    "scale": writer.write(f"{name}_scale", scale, "<f8"),
+                }
+            )
+        else:
+            raise ValueError(f"Unsupported feature pipeline step for compact export: {kind}")
+    return {
+        "derived": derived,
+        "steps": steps,
+        "feature_names": [str(name) for name in feature_pipeline.get_feature_names_out()],
+    }
+
+
+class CompactFeaturePipeline:
+    """NumPy re-implementation of the fitted feature pipeline (same output as ColumnTransformer.transform)"""
+
+    def __init__(self, spec: dict, arrays: dict[str, np.ndarray]):
+        derived = [DerivedFeature.from_dict(definition) for definition in spec.get("derived", [])]  # Older exports: none
+        self.derived = CompiledDerivedFeatures(derived) if derived else None
+        self.steps = []
+        for step in spec["steps"]:
+            if step["type"] == "one_hot":
+                categories = [np.array(categories, dtype=object) for categories in step["categories"]]
+                self.steps.append(("one_hot", step["columns"], categories))
+            else:
+                self.steps.append(("standard_scaler", step["columns"], (arrays[step["mean"]], arrays[step["scale"]])))
+        self.feature_names = spec["feature_names"]
+        self.n_features = len(self.feature_names)
+
+    def get_feature_names_out(self) -> np.ndarray:
+        return np.array(self.feature_names, dtype=object)
+
+    def transform(self, X: Columns) -> np.ndarray:
+        """
+        Encode raw customer columns.
+
+        Parameters
+        ----------
+        X: Columns
+            DataFrame or mapping column name -> 1d array
+
+        Returns:
+            np.ndarray: (n_rows, n_features) float64 matrix
+        """
+        if self.derived is not None:
+            X = ChainMap(self.derived.columns(X), X)
+        n_rows = len(X[self.steps[0][1][0]])
+        output = np.empty((n_rows, self.n_features), dtype=np.float64)
+        position = 0
+        for kind, columns, params in self.steps:
+            if kind == "one_hot":
+                for column, categories in zip(columns, params):
+                    values = np.asarray(X[column], dtype=object)
+                    output[:, position:position + len(categories)] = values[:, None] == categories[None, :]
+                    position += len(categories)
+            else:
+                mean, scale = params
+                for i, column in enumerate(columns):
+                    output[:, position] = (np.asarray(X[column], dtype=np.float64) - mean[i]) / scale[i]
+                    position += 1
+        return output
+
+
+# ----- Models -----
+
+def export_model(model, writer: ArrayWriter) -> dict:
+    """
+    Describe a fitted classifier: linear models (coefficients) or sklearn forests (compiled node arrays,
+    see src/compiled_trees.py).
+    """
+    kind = type(model).__name__
+    classes = [int(label) for label in model.classes_]
+
+    if kind in LINEAR_MODELS:
+        return {
+            "type": "linear",
+            "classes": classes,
+            "coef": writer.write("coef", model.coef_, "<f8"),
+            "intercept": writer.write("intercept", model.intercept_, "<f8"),
+        }
+
+    if kind in FOREST_MODELS:
+        # Same node arrays as the compiled inference mode, with float64 leaves: exact sklearn probabilities
+        compiled = compile_trees(model, value_dtype=np.float64)
+        return {
+            "type": "trees",
+            "classes": classes,
+            "kind": compiled.kind,
+            "base_margin": compiled.base_margin,
+            **{
+                name: writer.write(name, array, TREE_ARRAY_DTYPES[name])
+                for name, array in compiled.arrays.items()
+            },
+        }
+
+    raise ValueError(f"Unsupported model for compact export: {kind}")
+
+
+class CompactModel:
+    """predict/predict_proba on memory-mapped parameters, matching the sklearn estimator"""
+
+    def __init__(self, spec: dict, arrays: dict[str, np.ndarray]):
+        self.type = spec["type"]
+        self.classes_ = np.array(spec["classes"])
+        self.params = {
+            key: arrays[value] for key, value in spec.items() if isinstance(value, str) and value in arrays
+        }
+        self.trees = None
+        if self.type == "trees":
+            self.trees = CompiledEnsemble(
+                kind=spec["kind"], base_margin=spec["base_margin"], classes=self.classes_, **self.params
+            )
+
+    def compiled(self) -> CompiledEnsemble:
+        """
+        Compiled inference model (float32 leaves), the same as compile_trees on the pickled forest.
+
+        Returns:
+            CompiledEnsemble: Node arrays shared with this model (memory-mapped), leaves cast to float32
+        """
+        if self.trees is None:
+            raise ValueError(f"Only tree models can be compiled, not {self.type} models")
+        return CompiledEnsemble(
+            kind=self.trees.kind,
+            base_margin=self.trees.base_margin,
+            classes=self.classes_,
+            **{**self.params, "value": self.params["value"].astype(np.float32)},
+        )
+
+    def _check_input(self, X: np.ndarray) -> np.ndarray:
+        """Same input validation as sklearn: trees route NaN through default_left, linear models reject it"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.type == "trees":
+            if np.isinf(X).any():
+                raise ValueError("Input X contains infinity")
+        elif not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity")
+        return X
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = self._check_input(X)
+        if self.type == "trees":
+            return self.trees.predict_proba(X)
+        decision = X @ self.params["coef"].T + self.params["intercept"]
+        if decision.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-decision[:, 0]))
+            return np.column_stack([1 - positive, positive])
+        decision = np.exp(decision - decision.max(axis=1, keepdims=True))  # Multinomial
+        return decision / decision.sum(axis=1, keepdims=True)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = self._check_input(X)
+        if self.type == "linear" and len(self.classes_) == 2:
+            # Same rule as sklearn: decision function > 0
+            decision = X @ self.params["coef"][0] + self.params["intercept"][0]
+            return self.classes_[(decision > 0).astype(int)]
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# ----- Export / load -----
+
+def export_compact_artifacts(model, feature_pipeline, output_dir: str, git_sha: Optional[str] = None) -> dict:
+    """
+    Export a fitted model and feature pipeline in the compact format.
+
+    Parameters
+    ----------
+    model:
+        Fitted classifier (LogisticRegression(CV), RandomForestClassifier or ExtraTreesClassifier)
+    feature_pipeline:
+        Fitted ColumnTransformer (OneHotEncoder + StandardScaler), optionally after derived features
+    output_dir: str
+        Directory to write the arrays and manifest.json (replaced if it exists)
+    git_sha: Optional[str]
+        Commit the model was trained on (defaults to the current one)
+
+    Returns:
+        dict: Manifest
+
+    Example:
+        >>> export_compact_artifacts(joblib.load("artifacts/model.pkl"), joblib.load("artifacts/feature_pipeline.pkl"), "artifacts/compact")
+    """
+    from .metrics import compute_git_sha
+
+    tmp_dir = output_dir.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    writer = ArrayWriter(tmp_dir)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "git_sha": compute_git_sha() if git_sha is None else git_sha,
+        "created_at": datetime.now().strftime("%d/%m/%Y, %H:%M:%S"),
+        "feature_pipeline": export_feature_pipeline(feature_pipeline, writer),
+        "model": {"class": type(model).__name__, **export_model(model, writer)},
+    }
+    manifest["arrays"] = writer.arrays
+    with open(os.path.join(tmp_dir, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    # Swap directories so that readers never see a half written export
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    return manifest
+
+
+def load_compact_artifacts(artifacts_dir: str, verify: bool = True) -> tuple:
+    """
+    Load compact artifacts (memory-mapped, no unpickling).
+
+    Parameters
+    ----------
+    artifacts_dir: str
+        Directory with manifest.json and the array files
+    verify: bool
+        Check the sha256 of every array
+
+    Returns:
+        tuple: (CompactModel, CompactFeaturePipeline, manifest)
+    """
+    with open(os.path.join(artifacts_dir, MANIFEST_FILENAME), "r") as f:
+        manifest = json.load(f)
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact artifact format version: {manifest['format_version']}")
+
+    arrays = {
+        name: load_array(artifacts_dir, spec, verify=verify)
+        for name, spec in manifest["arrays"].items()
+    }
+    model = CompactModel(manifest["model"], arrays)
+    feature_pipeline = CompactFeaturePipeline(manifest["feature_pipeline"], arrays)
+    return model, feature_pipeline, manifest
+
+
+def export_compact_artifacts_cli():
+    """
+    Convert the pickled artifacts (model.pkl, feature_pipeline.pkl) to the compact format
+    """
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Export churn model artifacts in the compact format")
+    parser.add_argument("--artifacts", type=str, default="artifacts/", help="Directory with model.pkl and feature_pipeline.pkl")
+    args = parser.parse_args()
+
+    try:  # Keep the version of the trained model, not of the current checkout
+        with open(os.path.join(args.artifacts, "metrics.json"), "r") as f:
+            git_sha = json.load(f).get("git_sha")
+    except OSError:
+        git_sha = None
+
+    manifest = export_compact_artifacts(
+        joblib.load(os.path.join(args.artifacts, "model.pkl")),
+        joblib.load(os.path.join(args.artifacts, "feature_pipeline.pkl")),
+        os.path.join(args.artifacts, COMPACT_DIRNAME),
+        git_sha=git_sha,
+    )
+    print(f"Exported {manifest['model']['class']} with {len(manifest['arrays'])} arrays")
+
+
+if __name__ == "__main__":
+    export_compact_artifacts_cli()
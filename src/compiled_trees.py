@@ -0,0 +1,346 @@
+# Compiled inference for tree ensembles: contiguous node arrays, float32 thresholds, int16 feature ids
+# Scores batches with a vectorized NumPy traversal instead of the sklearn / xgboost / lightgbm wrappers
+# CLI: python -m src.compiled_trees --artifacts artifacts/ --data data/customer_churn_synth.csv
+
+import os
+import json
+import pickle
+from typing import Optional
+
+import numpy as np
+
+BLOCK_ROWS = 4096  # Rows traversed at once: bounds the (rows, trees) node index matrix
+
+
+def round_down_float32(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 <= threshold, so that x <= threshold and float32(x) <= result agree for float32 x.
+
+    sklearn and XGBoost compare float32 features, so these thresholds are exact for them.
+    """
+    rounded = threshold.astype(np.float32)
+    too_large = rounded.astype(np.float64) > threshold
+    rounded[too_large] = np.nextafter(rounded[too_large], np.float32(-np.inf))
+    return rounded
+
+
+class TreeBuilder:
+    """Accumulate nodes of several trees into flat arrays (leaves point to themselves)"""
+
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right = [], [], [], []
+        self.default_left, self.value, self.roots = [], [], []
+
+    def add_node(self) -> int:
+        for column in (self.feature, self.threshold, self.left, self.right, self.default_left, self.value):
+            column.append(0)
+        return len(self.feature) - 1
+
+    def set_split(self, node: int, feature: int, threshold: float, left: int, right: int, default_left: bool) -> None:
+        self.feature[node], self.threshold[node] = feature, threshold
+        self.left[node], self.right[node], self.default_left[node] = left, right, default_left
+
+    def set_leaf(self, node: int, value: float) -> None:
+        # A leaf points to itself
+        self.left[node], self.right[node], self.value[node] = node, node, value
+        self.threshold[node] = np.inf
+
+    def build(self, kind: str, n_features: int, base_margin: float, value_dtype) -> "CompiledEnsemble":
+        return build_ensemble(
+            kind,
+            np.array(self.feature),
+            np.array(self.threshold, dtype=np.float64),
+            np.array(self.left),
+            np.array(self.right),
+            np.array(self.default_left),
+            np.array(self.value),
+            np.array(self.roots),
+            n_features,
+            base_margin,
+            value_dtype,
+        )
+
+
+def build_ensemble(
+    kind: str,
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+    default_left: np.ndarray,
+    value: np.ndarray,
+    roots: np.ndarray,
+    n_features: int,
+    base_margin: float,
+    value_dtype,
+) -> "CompiledEnsemble":
+    """Cast node arrays to the compiled dtypes (leaves must already point to themselves)"""
+    if n_features > np.iinfo(np.int16).max:
+        raise ValueError(f"Too many features for int16 feature ids: {n_features}")
+    left, right, roots = left.astype(np.int32), right.astype(np.int32), roots.astype(np.int32)
+    return CompiledEnsemble(
+        kind=kind,
+        feature=feature.astype(np.int16),
+        threshold=round_down_float32(threshold),
+        left=left,
+        right=right,
+        default_left=default_left.astype(np.bool_),
+        value=value.astype(value_dtype),
+        roots=roots,
+        base_margin=base_margin,
+    )
+
+
+class CompiledEnsemble:
+    """
+    Binary tree ensemble flattened into contiguous arrays.
+
+    kind "forest": churn probability = mean of the leaf values (class 1 probabilities).
+    kind "boosted": churn probability = sigmoid(base_margin + sum of the leaf values).
+    Rows go left when x <= threshold, or when x is NaN and default_left is set.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        base_margin: float = 0.0,
+        classes: Optional[np.ndarray] = None,
+    ):
+        self.kind = kind
+        self.feature, self.threshold = feature, threshold
+        self.left, self.right, self.default_left = left, right, default_left
+        self.value, self.roots = value, roots
+        self.base_margin = base_margin
+        self.classes_ = np.array([0, 1]) if classes is None else np.asarray(classes)
+        # Traversal tables: children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.column_stack([left, right]).ravel()
+        self.is_split = left != np.arange(len(left))
+
+    @property
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Node arrays, e.g. to save them (see src/compact_artifacts.py)"""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "default_left": self.default_left,
+            "value": self.value,
+            "roots": self.roots,
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        X_flat = X.ravel()
+        check_missing = bool(np.isnan(X).any())
+        # One (row, tree) pair per element; only pairs still at a split node are advanced
+        node = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, n_trees)
+        active = np.flatnonzero(self.is_split[node])
+        while active.size:
+            current = node[active]
+            x = X_flat[row_offset[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if check_missing:
+                go_left |= np.isnan(x) & self.default_left[current]
+            current = self.children[2 * current + ~go_left]
+            node[active] = current
+            active = active[self.is_split[current]]
+        return self.value[node].reshape(n_rows, n_trees)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities, scored by blocks of BLOCK_ROWS rows.
+
+        Returns:
+            np.ndarray: (n_rows, 2) float64
+        """
+        X = np.asarray(X, dtype=np.float32)
+        positive = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), BLOCK_ROWS):
+            leaf_values = self._leaf_values(X[start:start + BLOCK_ROWS]).astype(np.float64)
+            if self.kind == "forest":
+                positive[start:start + BLOCK_ROWS] = leaf_values.mean(axis=1)
+            else:
+                margin = self.base_margin + leaf_values.sum(axis=1)
+                positive[start:start + BLOCK_ROWS] = 1 / (1 + np.exp(-margin))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+
+# ----- Converters -----
+
+def compile_sklearn_forest(model, value_dtype=np.float32) -> CompiledEnsemble:
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])[:-1]
+    columns = {"feature": [], "threshold": [], "left": [], "right": [], "default_left": [], "value": []}
+    for tree, offset in zip(trees, offsets):
+        node = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left < 0
+        counts = tree.value[:, 0, :]
+        columns["feature"].append(np.where(is_leaf, 0, tree.feature))
+        columns["threshold"].append(np.where(is_leaf, np.inf, tree.threshold))
+        columns["left"].append(np.where(is_leaf, node, tree.children_left + offset))
+        columns["right"].append(np.where(is_leaf, node, tree.children_right + offset))
+        columns["default_left"].append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)))
+        columns["value"].append(counts[:, 1] / counts.sum(axis=1))  # Class 1 probability
+    return build_ensemble(
+        "forest",
+        *(np.concatenate(columns[name]) for name in columns),
+        roots=offsets,
+        n_features=model.n_features_in_,
+        base_margin=0.0,
+        value_dtype=value_dtype,
+    )
+
+
+def compile_xgboost(model, value_dtype=np.float32) -> CompiledEnsemble:
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())["learner"]
+    if config["learner_model_param"]["num_class"] not in ("0", "1") or config["objective"]["name"] != "binary:logistic":
+        raise ValueError("Only binary:logistic XGBoost models can be compiled")
+    base_score = float(config["learner_model_param"]["base_score"].strip("[]"))
+    feature_index = {name: i for i, name in enumerate(booster.feature_names or [])}
+
+    builder = TreeBuilder()
+
+    def add(tree: dict) -> int:
+        node = builder.add_node()
+        if "leaf" in tree:
+            builder.set_leaf(node, tree["leaf"])
+            return node
+        children = {child["nodeid"]: child for child in tree["children"]}
+        yes, no = add(children[tree["yes"]]), add(children[tree["no"]])
+        feature = feature_index[tree["split"]] if feature_index else int(tree["split"][1:])
+        # XGBoost goes left when x < split_condition (float32): same as x <= previous float32
+        threshold = float(np.nextafter(np.float32(tree["split_condition"]), np.float32(-np.inf)))
+        builder.set_split(node, feature, threshold, yes, no, tree["missing"] == tree["yes"])
+        return node
+
+    for dump in booster.get_dump(dump_format="json"):
+        builder.roots.append(add(json.loads(dump)))
+    return builder.build("boosted", model.n_features_in_, float(np.log(base_score / (1 - base_score))), value_dtype)
+
+
+def compile_lightgbm(model, value_dtype=np.float32) -> CompiledEnsemble:
+    dump = model.booster_.dump_model()
+    if dump["num_class"] != 1 or not dump["objective"].startswith("binary"):
+        raise ValueError("Only binary LightGBM models can be compiled")
+
+    builder = TreeBuilder()
+
+    def add(tree: dict) -> int:
+        node = builder.add_node()
+        if "leaf_value" in tree:
+            builder.set_leaf(node, tree["leaf_value"])
+            return node
+        if tree["decision_type"] != "<=":
+            raise ValueError("Categorical LightGBM splits cannot be compiled")
+        if tree["missing_type"] == "Zero":
+            raise ValueError("LightGBM models with zero_as_missing cannot be compiled")
+        # missing_type None: LightGBM scores NaN as 0.0
+        default_left = tree["default_left"] if tree["missing_type"] == "NaN" else 0.0 <= tree["threshold"]
+        left, right = add(tree["left_child"]), add(tree["right_child"])
+        builder.set_split(node, tree["split_feature"], tree["threshold"], left, right, default_left)
+        return node
+
+    for tree in dump["tree_info"]:
+        builder.roots.append(add(tree["tree_structure"]))
+    return builder.build("boosted", model.n_features_in_, 0.0, value_dtype)
+
+
+COMPILERS = {
+    "RandomForestClassifier": compile_sklearn_forest,
+    "ExtraTreesClassifier": compile_sklearn_forest,
+    "XGBClassifier": compile_xgboost,
+    "LGBMClassifier": compile_lightgbm,
+}
+
+
+def compile_trees(model, value_dtype=np.float32) -> CompiledEnsemble:
+    """
+    Flatten a fitted binary tree ensemble into a CompiledEnsemble.
+
+    Thresholds are stored as float32 (rounded down, exact for sklearn and XGBoost which compare
+    float32 features; LightGBM compares float64 so rows within float32 precision of a threshold
+    may switch branch), feature ids as int16 and leaf values as value_dtype.
+
+    Parameters
+    ----------
+    model:
+        Fitted RandomForestClassifier, ExtraTreesClassifier, XGBClassifier or LGBMClassifier
+    value_dtype:
+        Leaf values dtype (float32 halves their memory, float64 reproduces sklearn forests exactly)
+
+    Returns:
+        CompiledEnsemble: predict / predict_proba replacement for the model
+
+    Example:
+        >>> compiled = compile_trees(joblib.load("artifacts/model.pkl"))
+        >>> compiled.predict_proba(X)
+    """
+    kind = type(model).__name__
+    if kind not in COMPILERS:
+        raise ValueError(f"Unsupported model for compiled inference: {kind}")
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary classifiers can be compiled")
+    compiled = COMPILERS[kind](model, value_dtype)
+    compiled.classes_ = np.asarray(model.classes_)
+    return compiled
+
+
+def compare_predictions(model, compiled: CompiledEnsemble, X: np.ndarray) -> dict:
+    """
+    Accuracy difference between the original model and its compiled version.
+
+    Returns:
+        dict: max/mean absolute churn probability difference, share of rows with the same class,
+        and memory of both models (pickle size vs node arrays)
+    """
+    expected = model.predict_proba(X)[:, 1]
+    actual = compiled.predict_proba(X)[:, 1]
+    return {
+        "rows": len(X),
+        "max_abs_diff": float(np.abs(expected - actual).max()),
+        "mean_abs_diff": float(np.abs(expected - actual).mean()),
+        "class_agreement": float((model.predict(X) == compiled.predict(X)).mean()),
+        "model_bytes": len(pickle.dumps(model)),
+        "compiled_bytes": compiled.nbytes,
+    }
+
+
+def compare_predictions_cli():
+    """
+    Report the accuracy difference of the compiled inference mode on a dataset
+    """
+    import argparse
+    import joblib
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Compare a tree ensemble with its compiled version")
+    parser.add_argument("--artifacts", type=str, default="artifacts/", help="Directory with model.pkl and feature_pipeline.pkl")
+    parser.add_argument("--data", type=str, default="data/customer_churn_synth.csv", help="Customers to score")
+    args = parser.parse_args()
+
+    model = joblib.load(os.path.join(args.artifacts, "model.pkl"))
+    feature_pipeline = joblib.load(os.path.join(args.artifacts, "feature_pipeline.pkl"))
+    X = feature_pipeline.transform(pd.read_csv(args.data).drop(columns="churned", errors="ignore"))
+    print(json.dumps(compare_predictions(model, compile_trees(model), X), indent=4))
+
+
+if __name__ == "__main__":
+    compare_predictions_cli()
@@ -0,0 +1,118 @@
+# Declarative derived features (e.g. latency x downtime), compiled into one vectorized NumPy transform
+# NumPy only: shared by training (features.py), /predict/, bulk scoring, compact artifacts and drift monitoring
+
+from dataclasses import asdict, dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+
+OPERATIONS = {"product": 2, "ratio": 2, "bucket": 1}  # Operation -> number of input columns
+
+
+@dataclass(frozen=True)
+class DerivedFeature:
+    """
+    Numeric feature computed from raw customer columns.
+
+    Operations:
+        product: inputs[0] * inputs[1]
+        ratio: inputs[0] / (inputs[1] + offset)
+        bucket: index of the bin of inputs[0] (np.searchsorted(bins, value, side="right"), NaN stays NaN)
+    """
+
+    name: str
+    op: str
+    inputs: tuple[str, ...]
+    offset: float = 0.0
+    bins: tuple[float, ...] = ()
+
+    def __post_init__(self):
+        if self.op not in OPERATIONS:
+            raise ValueError(f"Unknown operation {self.op!r} for {self.name}, expected one of {list(OPERATIONS)}")
+        if len(self.inputs) != OPERATIONS[self.op]:
+            raise ValueError(f"{self.name}: {self.op} takes {OPERATIONS[self.op]} input columns, got {len(self.inputs)}")
+        if self.op == "bucket" and list(self.bins) != sorted(self.bins):
+            raise ValueError(f"{self.name}: bins must be sorted")
+
+    def to_dict(self) -> dict:
+        """JSON-ready definition (tuples as lists)"""
+        return {**asdict(self), "inputs": list(self.inputs), "bins": list(self.bins)}
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "DerivedFeature":
+        return cls(**{**spec, "inputs": tuple(spec["inputs"]), "bins": tuple(spec.get("bins", ()))})
+
+
+DERIVED_FEATURES = (
+    DerivedFeature("latency_x_downtime", "product", ("avg_latency_ms", "downtime_hours_30d")),
+    DerivedFeature("tickets_per_tenure_month", "ratio", ("support_tickets_30d", "tenure_months"), offset=1.0),
+    DerivedFeature("discount_bucket", "bucket", ("discount_pct",), bins=(10.0, 20.0, 30.0)),
+)  # Used by training: added to the numerical features (scaled with them)
+
+
+class CompiledDerivedFeatures:
+    """
+    Derived features grouped by operation: each group is computed with one NumPy expression over all its features.
+    """
+
+    def __init__(self, definitions: Sequence[DerivedFeature]):
+        self.definitions = tuple(definitions)
+        self.names = [definition.name for definition in self.definitions]
+        self.input_names = list(dict.fromkeys(name for definition in self.definitions for name in definition.inputs))
+        position = {name: i for i, name in enumerate(self.input_names)}
+
+        def group(op: str) -> list[tuple[int, DerivedFeature]]:
+            return [(i, definition) for i, definition in enumerate(self.definitions) if definition.op == op]
+
+        # (output column, first input, second input) index arrays per binary operation
+        self.products = tuple(
+            np.array(indices, dtype=np.intp)
+            for indices in zip(*[(i, position[d.inputs[0]], position[d.inputs[1]]) for i, d in group("product")])
+        )
+        self.ratios = tuple(
+            np.array(indices, dtype=np.intp)
+            for indices in zip(*[(i, position[d.inputs[0]], position[d.inputs[1]]) for i, d in group("ratio")])
+        )
+        self.ratio_offsets = np.array([d.offset for _, d in group("ratio")], dtype=np.float64)
+        self.buckets = [(i, position[d.inputs[0]], np.array(d.bins, dtype=np.float64)) for i, d in group("bucket")]
+
+    def transform(self, X: Mapping) -> np.ndarray:
+        """
+        Compute the derived features.
+
+        Parameters
+        ----------
+        X: Mapping
+            DataFrame or mapping column name -> 1d array with (at least) the input columns
+
+        Returns:
+            np.ndarray: (n_rows, n_derived) float64 matrix, columns in definition order
+        """
+        inputs = np.column_stack([np.asarray(X[name], dtype=np.float64) for name in self.input_names])
+        output = np.empty((len(inputs), len(self.names)), dtype=np.float64)
+        if self.products:
+            out, a, b = self.products
+            output[:, out] = inputs[:, a] * inputs[:, b]
+        if self.ratios:
+            out, numerator, denominator = self.ratios
+            with np.errstate(divide="ignore", invalid="ignore"):  # Zero denominators give inf, rejected by the model
+                output[:, out] = inputs[:, numerator] / (inputs[:, denominator] + self.ratio_offsets)
+        for out, column, bins in self.buckets:
+            values = inputs[:, column]
+            output[:, out] = np.where(np.isnan(values), np.nan, np.searchsorted(bins, values, side="right"))
+        return output
+
+    def columns(self, X: Mapping) -> dict[str, np.ndarray]:
+        """Derived features as a mapping name -> 1d array"""
+        return dict(zip(self.names, self.transform(X).T))
+
+
+def add_derived_features(df, definitions: Sequence[DerivedFeature] = DERIVED_FEATURES):
+    """
+    Append the derived features to a DataFrame of raw customer rows (e.g. for drift monitoring).
+
+    Returns:
+        pd.DataFrame: Copy of df with one more column per definition
+    """
+    compiled = CompiledDerivedFeatures(definitions)
+    return df.assign(**compiled.columns(df))
@@ -6,10 +6,11 @@ import numpy as np
 import json
 import pandas as pd
 import pandas.api.types as ptypes  # Split features intro cat and num
-from scipy.stats import ks_2samp
 from typing import TypedDict
 import os
 
+from .derived_features import add_derived_features
+
 ARTIFACTS_DIR = "artifacts/"
 DRIFT_REPORT_FILENAME = "drift_report.json"
 DRIFT_REPORT_PATH = os.path.join(ARTIFACTS_DIR, DRIFT_REPORT_FILENAME)
@@ -52,6 +53,8 @@ class DriftComputer():
             >>> compute_ks_test('downtime_hours_30d', pd.read_csv("churn_ref_sample.csv"), pd.read_csv("churn_shifted_sample.csv"))
             'output'
         """
+        from scipy.stats import ks_2samp  # scipy.stats is slow to import, load it on first use
+
         feature_values_ref = df_ref[feature_name]
         feature_values_new = df_new[feature_name]
         ks_statistic, p_value = ks_2samp(feature_values_ref, feature_values_new)
@@ -129,7 +132,7 @@ class DriftComputer():
             return self.compute_psi_test(self.feature_name, self.df_ref, self.df_new, bins=10)
         
 
-def monitor_drift(data_ref_path: str, data_new_path: str) -> None:
+def monitor_drift(data_ref_path: str, data_new_path: str, output_path: str = DRIFT_REPORT_PATH) -> None:
     """
     Run data shift test for all feature variables.
 
@@ -139,6 +142,8 @@ def monitor_drift(data_ref_path: str, data_new_path: str) -> None:
         Path to the Reference Data
     data_new_path : str
         Path to the New Data
+    output_path : str
+        Path to save the drift report (JSON)
 
     Returns:
         None: Results are saved in the data directory
@@ -149,8 +154,9 @@ def monitor_drift(data_ref_path: str, data_new_path: str) -> None:
     # Read Data and features
     # TODO: validate if both dfs have the same features (try-except)
 
-    df_ref = pd.read_csv(data_ref_path)
-    df_new = pd.read_csv(data_new_path)
+    # Derived features are monitored too: same definitions as the model inputs
+    df_ref = add_derived_features(pd.read_csv(data_ref_path))
+    df_new = add_derived_features(pd.read_csv(data_new_path))
     features = list(set(df_ref.columns.union(df_new.columns)))
 
     features_num = [col for col in df_ref.columns 
@@ -176,7 +182,7 @@ def monitor_drift(data_ref_path: str, data_new_path: str) -> None:
         drift_data["overall_drift"] = True
 
     # Save Drift Report
-    with open(DRIFT_REPORT_PATH, "w") as f:
+    with open(output_path, "w") as f:
         json.dump(drift_data, f, indent=4)
 
 
@@ -1,14 +1,51 @@
-from typing import List, Type
+from typing import List, Optional, Sequence, Type
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer  # feature inference_pipeline
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.preprocessing import StandardScaler
 
+from .derived_features import DERIVED_FEATURES, CompiledDerivedFeatures, DerivedFeature  # noqa: F401 (re-exported)
+
+
+class DerivedFeatureTransformer(TransformerMixin, BaseEstimator):
+    """
+    Append DerivedFeature columns to the raw customer columns (stateless, runs before the ColumnTransformer).
+    """
+
+    def __init__(self, definitions: Sequence[DerivedFeature] = DERIVED_FEATURES):
+        self.definitions = definitions
+
+    def fit(self, X, y=None):
+        self.compiled_ = CompiledDerivedFeatures(self.definitions)
+        if isinstance(X, pd.DataFrame):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def transform(self, X):
+        """
+        Returns:
+            DataFrame (for DataFrame input) or dict column name -> 1d array, with the derived columns appended
+        """
+        derived = self.compiled_.transform(X)
+        if isinstance(X, pd.DataFrame):
+            return pd.concat([X, pd.DataFrame(derived, columns=self.compiled_.names, index=X.index)], axis=1)
+        return {**X, **dict(zip(self.compiled_.names, derived.T))}
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        if input_features is None:
+            input_features = getattr(self, "feature_names_in_", [])
+        return np.asarray([*input_features, *self.compiled_.names], dtype=object)
+
 
 def build_feature_pipeline(
     encoder: Type[OneHotEncoder],
     scaler: Type[StandardScaler],
     categorical_features: List[str],
     numerical_features: List[str],
+    derived_features: Optional[Sequence[DerivedFeature]] = None,
 ) -> str:
     """
     Initialize column transformer for a given encoder (cat to num), scaler, as well as categoriacal and numerical features.
@@ -23,17 +60,29 @@ def build_feature_pipeline(
         Description
     numerical_features: List[str]
         Description
+    derived_features: Optional[Sequence[DerivedFeature]]
+        Derived features (e.g. DERIVED_FEATURES) computed before the column transformer and scaled with
+        the numerical features. None returns the column transformer alone (legacy pipeline)
 
     Returns:
-        type:
+        type: ColumnTransformer, or Pipeline(derived -> columns) when derived_features are given
 
     Example:
         >>> ('arg1', 'arg2')
         'output'
     """
-    return ColumnTransformer(
+    derived_names = [definition.name for definition in derived_features or ()]
+    column_transformer = ColumnTransformer(
         [
             ("cat", encoder, categorical_features),
-            ("num", scaler, numerical_features),
+            ("num", scaler, [*numerical_features, *derived_names]),
+        ]
+    )
+    if not derived_features:
+        return column_transformer
+    return Pipeline(
+        [
+            ("derived", DerivedFeatureTransformer(tuple(derived_features))),
+            ("columns", column_transformer),
         ]
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,213 @@
+# Low overhead serving instrumentation: per-stage latency histograms, rolling percentiles and counters
+# Exposed in Prometheus text format on GET /metrics and summarized on GET /health/
+
+import itertools
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+
+STAGES = ("parse_validate", "transform", "predict", "serialize", "request")
+ROUTES = ("/predict/", "/predict/batch/")  # Timed routes, stage latencies are labelled by route (path)
+# Histogram upper bounds in seconds (Prometheus "le" labels), the last bucket is +Inf
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+ROLLING_WINDOW = 4096  # Latest observations kept per stage for p50/p95/p99
+UNMATCHED_PATH_LABEL = "other"  # 404s and scans share one series: labels stay bounded
+
+
+def escape_label_value(value: str) -> str:
+    """Escape a label value as the Prometheus text format requires (backslash, double quote, newline)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Shard:
+    """Metrics written by a single thread: no locks on the hot path"""
+
+    def __init__(self, series: list, n_buckets: int):
+        self.bucket_counts = {key: [0] * (n_buckets + 1) for key in series}
+        self.sums = dict.fromkeys(series, 0.0)
+        self.counters = defaultdict(int)
+
+
+class ServingMetrics:
+    """
+    Lock-free (per-thread sharded) latency histograms, rolling percentiles and counters.
+
+    Latencies are kept per (route, stage) series, all allocated upfront. Each thread updates its
+    own shard, so observe() is a bisect plus two plain increments.
+    Readers (/metrics, /health/) sum the shards and may miss updates made while they read.
+    Rolling windows are ring buffers indexed by itertools.count, whose next() is atomic in CPython.
+    """
+
+    def __init__(
+        self,
+        stages: tuple = STAGES,
+        routes: tuple = ROUTES,
+        buckets: tuple = LATENCY_BUCKETS,
+        window: int = ROLLING_WINDOW,
+    ):
+        self.stages = stages
+        self.routes = routes
+        self.buckets = buckets
+        self.window = window
+        self.series = [(route, stage) for route in routes for stage in stages]
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._shards_lock = threading.Lock()  # Taken once per thread, when its shard is created
+        self._rolling = {key: array("d", [0.0] * window) for key in self.series}
+        self._rolling_index = {key: itertools.count() for key in self.series}
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self.series, len(self.buckets))
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def observe(self, stage: str, seconds: float, route: str = ROUTES[0]) -> None:
+        """
+        Record the latency of a serving stage.
+
+        Parameters
+        ----------
+        stage: str
+            One of STAGES
+        seconds: float
+            Elapsed time (time.perf_counter() difference)
+        route: str
+            One of ROUTES, the route template of the request
+
+        Returns:
+            None
+        """
+        key = (route, stage)
+        shard = self._shard()
+        shard.bucket_counts[key][bisect_left(self.buckets, seconds)] += 1
+        shard.sums[key] += seconds
+        self._rolling[key][next(self._rolling_index[key]) % self.window] = seconds
+
+    def increment(self, name: str, **labels: str) -> None:
+        """
+        Increase a counter, e.g. increment("errors_total", stage="transform").
+        """
+        self._shard().counters[(name, tuple(sorted(labels.items())))] += 1
+
+    def _merged(self) -> tuple[dict, dict, dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        bucket_counts = {key: np.zeros(len(self.buckets) + 1, dtype=np.int64) for key in self.series}
+        sums = dict.fromkeys(self.series, 0.0)
+        counters = defaultdict(int)
+        for shard in shards:
+            for key in self.series:
+                bucket_counts[key] += shard.bucket_counts[key]
+                sums[key] += shard.sums[key]
+            for key, value in list(shard.counters.items()):
+                counters[key] += value
+        return bucket_counts, sums, counters
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Rolling latency percentiles over the latest observations of each stage, per route.
+
+        Returns:
+            dict: {route: {stage: {"count", "p50_ms", "p95_ms", "p99_ms"}}} for the observed stages
+        """
+        bucket_counts, _, _ = self._merged()
+        summary = {}
+        for route, stage in self.series:
+            n_observed = min(int(bucket_counts[route, stage].sum()), self.window)
+            if n_observed == 0:
+                continue
+            latencies_ms = np.frombuffer(self._rolling[route, stage], dtype=np.float64)[:n_observed] * 1000
+            p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+            summary.setdefault(route, {})[stage] = {
+                "count": n_observed,
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+            }
+        return summary
+
+    def render_prometheus(self, model_version: str) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        model_version: str
+            Served model version, added as a label
+
+        Returns:
+            str: Exposition text
+        """
+        bucket_counts, sums, counters = self._merged()
+        version = f'model_version="{escape_label_value(model_version)}"'
+        lines = [
+            "# HELP churn_model_info Served churn model",
+            "# TYPE churn_model_info gauge",
+            f"churn_model_info{{{version}}} 1",
+            "# HELP churn_stage_latency_seconds Latency of each serving stage",
+            "# TYPE churn_stage_latency_seconds histogram",
+        ]
+        for route, stage in self.series:
+            labels = f'path="{escape_label_value(route)}",stage="{stage}",{version}'
+            cumulative = np.cumsum(bucket_counts[route, stage])
+            for bound, count in zip((*self.buckets, "+Inf"), cumulative):
+                lines.append(f'churn_stage_latency_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"churn_stage_latency_seconds_sum{{{labels}}} {sums[route, stage]:.9f}")
+            lines.append(f"churn_stage_latency_seconds_count{{{labels}}} {cumulative[-1]}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE churn_{name} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    label_text = ",".join([f'{key}="{escape_label_value(label)}"' for key, label in labels] + [version])
+                    lines.append(f"churn_{name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentationMiddleware:
+    """
+    Pure ASGI middleware (cheaper than BaseHTTPMiddleware) timing every HTTP request.
+
+    Stores the start time in the request state ("request_start") so that handlers can time the
+    parse/validate stage, counts requests per route template ("other" for unmatched paths) and
+    status code, and records the end-to-end latency of the timed routes (metrics.routes) as their
+    "request" stage.
+    """
+
+    def __init__(self, app, metrics: ServingMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")  # Set by the router on a match
+            path = getattr(route, "path", None) or UNMATCHED_PATH_LABEL
+            if path in self.metrics.routes:
+                self.metrics.observe("request", time.perf_counter() - start, route=path)
+            self.metrics.increment("http_requests_total", path=path, status=str(status_code))
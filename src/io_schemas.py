@@ -45,3 +45,13 @@ class ActionPlanModel(BaseModel):
         "do_nothing"
     ]] = Field(default_factory=list, description="Actions to take based on findings")
     page_oncall: Optional[bool] = Field(default=False, description="Whether to page the on-call engineer")
+
+
+class ActionPlanRecord(ActionPlanModel):
+    id: int = Field(..., description="Store id, increasing with time")
+    ts: str = Field(..., description="ISO 8601 UTC timestamp when the plan was received")
+
+
+class ActionPlanPage(BaseModel):
+    items: List[ActionPlanRecord] = Field(default_factory=list, description="Action plans, newest first")
+    next_cursor: Optional[int] = Field(default=None, description="Cursor for the next (older) page, None on the last page")
@@ -0,0 +1,174 @@
+# Join served predictions with late-arriving churn labels and append hourly points to the metrics history
+# CLI: python -m src.label_join --predictions data/prediction_log --labels data/churn_labels.csv --metrics data/metrics_history.jsonl
+
+import os
+import json
+import glob
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .metrics import compute_classification_metrics
+from .prediction_log import PREDICTION_LOG_DIR, read_prediction_log
+
+METRICS_HISTORY_PATH = "data/metrics_history.jsonl"
+WINDOW_SECONDS = 60 * 60  # Hourly points, same as metrics_history.jsonl
+LABEL_DELAY_HOURS = 24  # Labels arrive late: an hour is closed only once this delay has passed
+DECIMALS = 3
+QUALITY_METRICS = ("roc_auc", "pr_auc", "acc")  # Required in every point, read by the agent
+
+
+def read_labels(labels_path: str) -> pd.DataFrame:
+    """
+    Read churn labels from a CSV file or a directory of CSV files (columns: request_id, churned).
+
+    Parameters
+    ----------
+    labels_path: str
+        CSV file or directory with label drops
+
+    Returns:
+        pd.DataFrame: One label per request_id (the latest drop wins)
+    """
+    paths = sorted(glob.glob(os.path.join(labels_path, "*.csv"))) if os.path.isdir(labels_path) else [labels_path]
+    labels = pd.concat(
+        [pd.read_csv(path, usecols=["request_id", "churned"], dtype={"request_id": str}) for path in paths],
+        ignore_index=True,
+    )
+    return labels.drop_duplicates("request_id", keep="last")
+
+
+def to_window_ts(window_start: float) -> str:
+    """Epoch seconds -> naive UTC ISO timestamp, the format of metrics_history.jsonl"""
+    return datetime.fromtimestamp(window_start, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def last_window_start(metrics_path: str) -> Optional[float]:
+    """
+    Start (epoch seconds) of the hour of the last point in the metrics history, None if empty.
+    """
+    if not os.path.isfile(metrics_path):
+        return None
+    last_line = None
+    with open(metrics_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last_line = line
+    if last_line is None:
+        return None
+    last_ts = datetime.fromisoformat(json.loads(last_line)["ts"])
+    if last_ts.tzinfo is None:
+        last_ts = last_ts.replace(tzinfo=timezone.utc)
+    return last_ts.timestamp() // WINDOW_SECONDS * WINDOW_SECONDS
+
+
+def compute_hourly_metrics(predictions: pd.DataFrame, labels: pd.DataFrame) -> list[dict]:
+    """
+    Compute one metrics_history point per hour of served predictions.
+
+    Hours whose quality metrics cannot be computed (no labeled rows, or a single class) are skipped.
+
+    Parameters
+    ----------
+    predictions: pd.DataFrame
+        Prediction log rows, see read_prediction_log
+    labels: pd.DataFrame
+        Churn labels (request_id, churned)
+
+    Returns:
+        list[dict]: Points with ts, roc_auc, pr_auc, acc, latency_p95_ms, error_rate, n_predictions and n_labeled
+    """
+    joined = predictions.merge(labels, on="request_id", how="left")
+    joined["window"] = joined["ts"] // WINDOW_SECONDS * WINDOW_SECONDS
+
+    points = []
+    for window, rows in joined.groupby("window", sort=True):
+        labeled = rows[~rows["error"] & rows["churned"].notna()]
+        metrics = compute_classification_metrics(
+            labeled["churned"], labeled["churn_likelihood"], curve_points=None
+        )
+        if any(metrics[name] is None for name in QUALITY_METRICS):
+            continue  # No labeled rows (or a single class): the agent expects numbers, skip the hour
+        points.append(
+            {
+                "ts": to_window_ts(window),
+                **{name: round(metrics[name], DECIMALS) for name in QUALITY_METRICS},
+                "latency_p95_ms": int(round(np.percentile(rows["latency_ms"], 95))),
+                "error_rate": round(float(rows["error"].mean()), DECIMALS),
+                "n_predictions": len(rows),
+                "n_labeled": len(labeled),
+            }
+        )
+    return points
+
+
+def join_labels(
+    predictions_dir: str,
+    labels_path: str,
+    metrics_path: str = METRICS_HISTORY_PATH,
+    label_delay_hours: float = LABEL_DELAY_HOURS,
+    now: Optional[float] = None,
+) -> list[dict]:
+    """
+    Append the hourly points that are new since the last run to the metrics history.
+
+    Only hours after the last point of the history are read (older log segments are skipped), and
+    only hours that ended at least label_delay_hours ago are emitted, so that late labels can land.
+
+    Parameters
+    ----------
+    predictions_dir: str
+        Prediction log directory
+    labels_path: str
+        CSV file or directory of CSV files with churn labels
+    metrics_path: str
+        metrics_history.jsonl to append to
+    label_delay_hours: float
+        Hours to wait for labels before closing a window
+    now: Optional[float]
+        Current epoch seconds (defaults to time.time())
+
+    Returns:
+        list[dict]: Appended points
+
+    Example:
+        >>> join_labels("data/prediction_log", "data/churn_labels.csv", "data/metrics_history.jsonl")
+    """
+    now = time.time() if now is None else now
+    last_window = last_window_start(metrics_path)
+    start = None if last_window is None else last_window + WINDOW_SECONDS
+    end = (now - label_delay_hours * 3600) // WINDOW_SECONDS * WINDOW_SECONDS
+
+    predictions = read_prediction_log(predictions_dir, since=start)
+    predictions = predictions[predictions["ts"] < end]
+    if predictions.empty:
+        return []
+
+    points = compute_hourly_metrics(predictions, read_labels(labels_path))
+    with open(metrics_path, "a", encoding="utf-8") as f:
+        for point in points:
+            f.write(json.dumps(point) + "\n")
+    return points
+
+
+def join_labels_cli():
+    """
+    Compute hourly quality points from the prediction log and churn labels
+    """
+    parser = argparse.ArgumentParser(description="Join churn labels with served predictions")
+    parser.add_argument("--predictions", type=str, default=PREDICTION_LOG_DIR, help="Prediction log directory")
+    parser.add_argument("--labels", type=str, required=True, help="CSV file or directory with request_id, churned")
+    parser.add_argument("--metrics", type=str, default=METRICS_HISTORY_PATH, help="Path to metrics_history.jsonl")
+    parser.add_argument("--label-delay-hours", type=float, default=LABEL_DELAY_HOURS)
+    args = parser.parse_args()
+
+    points = join_labels(args.predictions, args.labels, args.metrics, args.label_delay_hours)
+    print(f"Appended {len(points)} hourly points to {args.metrics}")
+
+
+if __name__ == "__main__":
+    join_labels_cli()
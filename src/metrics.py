@@ -1,23 +1,24 @@
 import subprocess
-from typing import Union, List
+from typing import Optional, Union, List
 import numpy as np
 import json
 import pandas as pd
-from sklearn.metrics import r2_score, roc_auc_score, precision_recall_curve
 from datetime import datetime
 
-current_timestamp = datetime.now()
-current_timestamp_str = current_timestamp.strftime("%d/%m/%Y, %H:%M:%S")
+DECISION_THRESHOLD = 0.5  # Same rule as model.predict: churn if probability > 0.5
+CALIBRATION_BINS = 10
+CURVE_POINTS = 101  # Curves are downsampled so that metrics.json stays small
+LOG_LOSS_EPS = np.finfo(np.float64).eps  # Same clipping as sklearn.metrics.log_loss
 
 
-def compute_git_sha() -> str:   
+def compute_git_sha() -> str:
     """
     Create ID for each git file. Keeping the data integrity
 
     Parameters
     ----------
     None
-    
+
     Returns:
         str: git sha hash
     """
@@ -29,10 +30,172 @@ def compute_git_sha() -> str:
     except Exception:
         return "N/A"
 
+
+def downsample_curve(curve: dict[str, np.ndarray], n_points: int = CURVE_POINTS) -> dict[str, list]:
+    """
+    Keep n_points evenly spaced (by index) points of a curve, always including both ends.
+
+    Parameters
+    ----------
+    curve: dict[str, np.ndarray]
+        Curve coordinates, all arrays with the same length
+    n_points: int
+        Maximum number of points to keep
+
+    Returns:
+        dict[str, list]: Downsampled curve, JSON serializable
+    """
+    length = len(next(iter(curve.values())))
+    index = np.unique(np.linspace(0, length - 1, num=min(n_points, length)).round().astype(int))
+    return {name: np.round(values[index], 6).tolist() for name, values in curve.items()}
+
+
+def _metrics_from_sorted(
+    y_sorted: np.ndarray,
+    score_sorted: np.ndarray,
+    threshold: float,
+    n_bins: int,
+    curve_points: Optional[int],
+) -> dict:
+    """
+    Compute every metric from labels and probabilities sorted by decreasing probability.
+
+    Counts of true/false positives at each distinct threshold are cumulative sums over the sorted
+    arrays, so ROC-AUC, PR-AUC and the curves come out of a single pass. Pointwise metrics
+    (log-loss, Brier score, accuracy) and calibration bins do not depend on the order.
+    """
+    n_samples = len(y_sorted)
+    n_positives = int(y_sorted.sum())
+    n_negatives = n_samples - n_positives
+
+    # Pointwise metrics
+    score_clipped = np.clip(score_sorted, LOG_LOSS_EPS, 1 - LOG_LOSS_EPS)
+    metrics = {
+        "n_samples": n_samples,
+        "positive_rate": n_positives / n_samples if n_samples else None,
+        "acc": float(np.mean((score_sorted > threshold) == y_sorted)) if n_samples else None,
+        "log_loss": float(
+            -np.mean(np.where(y_sorted, np.log(score_clipped), np.log1p(-score_clipped)))
+        ) if n_samples else None,
+        "brier": float(np.mean((score_sorted - y_sorted) ** 2)) if n_samples else None,
+        "roc_auc": None,
+        "pr_auc": None,
+    }
+
+    # Calibration: uniform bins over [0, 1]
+    bins = np.minimum((score_sorted * n_bins).astype(np.int64), n_bins - 1)
+    bin_count = np.bincount(bins, minlength=n_bins)
+    bin_score = np.bincount(bins, weights=score_sorted, minlength=n_bins)
+    bin_positives = np.bincount(bins, weights=y_sorted, minlength=n_bins)
+    filled = bin_count > 0
+    mean_predicted = np.divide(bin_score, bin_count, out=np.zeros(n_bins), where=filled)
+    fraction_positives = np.divide(bin_positives, bin_count, out=np.zeros(n_bins), where=filled)
+    metrics["ece"] = float(
+        np.sum(bin_count * np.abs(fraction_positives - mean_predicted)) / n_samples
+    ) if n_samples else None
+
+    if curve_points is not None:
+        metrics["calibration"] = {
+            "mean_predicted": np.round(mean_predicted[filled], 6).tolist(),
+            "fraction_positives": np.round(fraction_positives[filled], 6).tolist(),
+            "count": bin_count[filled].tolist(),
+        }
+
+    if n_positives == 0 or n_negatives == 0:
+        return metrics  # Ranking metrics are undefined with a single class
+
+    # Ranking metrics: one point per distinct threshold (last row of each run of tied scores)
+    distinct = np.r_[np.flatnonzero(np.diff(score_sorted)), n_samples - 1]
+    true_positives = np.cumsum(y_sorted, dtype=np.int64)[distinct]
+    false_positives = distinct + 1 - true_positives
+    thresholds = score_sorted[distinct]
+
+    tpr = np.r_[0.0, true_positives / n_positives]
+    fpr = np.r_[0.0, false_positives / n_negatives]
+    precision = true_positives / (true_positives + false_positives)
+    recall = true_positives / n_positives
+
+    metrics["roc_auc"] = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    metrics["pr_auc"] = float(np.sum(np.diff(np.r_[0.0, recall]) * precision))  # Average precision
+
+    if curve_points is not None:
+        metrics["roc_curve"] = downsample_curve(
+            {"fpr": fpr, "tpr": tpr, "thresholds": np.r_[1.0, thresholds]}, curve_points
+        )
+        metrics["pr_curve"] = downsample_curve(
+            {"precision": precision, "recall": recall, "thresholds": thresholds}, curve_points
+        )
+    return metrics
+
+
+def compute_classification_metrics(
+    y_true: Union[List, np.ndarray, pd.Series],
+    y_score: Union[List, np.ndarray, pd.Series],
+    slices: Optional[pd.DataFrame] = None,
+    threshold: float = DECISION_THRESHOLD,
+    n_bins: int = CALIBRATION_BINS,
+    curve_points: int = CURVE_POINTS,
+) -> dict:
+    """
+    Compute ROC-AUC, PR-AUC, accuracy, log-loss, Brier score and calibration bins, overall and per slice.
+
+    Rows are sorted once by probability; slices reuse that order (a subset of a sorted array is
+    sorted), so the cost is a single O(n log n) sort plus linear passes.
+
+    Parameters
+    ----------
+    y_true: Union[List, np.ndarray, pd.Series]
+        Ground truth values {0, 1}
+    y_score: Union[List, np.ndarray, pd.Series]
+        Predicted probability of the positive class
+    slices: Optional[pd.DataFrame]
+        Categorical columns (aligned with y_true) to compute the metrics per category
+    threshold: float
+        Probability above which a sample is classified as positive (for acc)
+    n_bins: int
+        Number of uniform calibration bins
+    curve_points: int
+        Number of points kept for the ROC and PR curves
+
+    Returns:
+        dict: roc_auc, pr_auc, acc, log_loss, brier, ece, calibration, roc_curve, pr_curve and,
+        if slices are given, {"slices": {column: {category: metrics without curves}}}
+
+    Example:
+        >>> compute_classification_metrics([1, 0, 1], [0.8, 0.3, 0.4])["roc_auc"]
+        1.0
+    """
+    y_true = np.asarray(y_true).ravel().astype(np.float64)
+    y_score = np.asarray(y_score, dtype=np.float64).ravel()
+    order = np.argsort(-y_score, kind="stable")
+    y_sorted, score_sorted = y_true[order], y_score[order]
+
+    metrics = _metrics_from_sorted(y_sorted, score_sorted, threshold, n_bins, curve_points)
+
+    if slices is not None:
+        metrics["slices"] = {}
+        for column in slices.columns:
+            codes, categories = pd.factorize(slices[column].to_numpy(), use_na_sentinel=True)
+            codes_sorted = codes[order]
+            metrics["slices"][column] = {
+                str(category): _metrics_from_sorted(
+                    y_sorted[codes_sorted == code],
+                    score_sorted[codes_sorted == code],
+                    threshold,
+                    n_bins,
+                    curve_points=None,
+                )
+                for code, category in enumerate(categories)
+            }
+    return metrics
+
+
 def save_metrics(
-    y_hat: Union[List, np.array, pd.DataFrame],
-    y_true: Union[List, np.array, pd.DataFrame],
-    output_path: str
+    y_score: Union[List, np.ndarray, pd.Series],
+    y_true: Union[List, np.ndarray, pd.Series],
+    output_path: str,
+    slices: Optional[pd.DataFrame] = None,
+    cv_summary: Optional[dict] = None,
 ) -> None:
     """
     Log relevant performance metrics for ML classification tasks.
@@ -41,32 +204,32 @@ def save_metrics(
 
     Parameters
     ----------
-    y_hat: Union[List, np.array, pd.DataFrame]
-        Array with the model binary predictions {0, 1}
+    y_score: Union[List, np.ndarray, pd.Series]
+        Array with the model churn probabilities [0, 1]
 
-    y_true: Union[List, np.array, pd.DataFrame]
+    y_true: Union[List, np.ndarray, pd.Series]
         Array with the ground truth values {0, 1}
 
     output_path: str
         Path to save the result metrics
 
+    slices: Optional[pd.DataFrame]
+        Categorical columns used to report metrics per slice (e.g. plan_type)
+
+    cv_summary: Optional[dict]
+        Cross-validation results (mean/std per fold), saved under "cv"
+
     Returns:
         None:
 
     Example:
-        >>> log_metrics([1, 0], [1, 1], "./logs.csv")
+        >>> save_metrics([0.9, 0.2], [1, 0], "artifacts/metrics.json")
     """
-    precision, recall, thresholds = precision_recall_curve(y_true, y_hat)
-
-    metrics = {
-        "r2": r2_score(y_true, y_hat),
-        "roc_auc": roc_auc_score(y_true, y_hat),
-        "precision": precision.tolist(),
-        "recall": recall.tolist(),
-        "thresholds": thresholds.tolist(),
-        "timestamp": current_timestamp_str,  # TODO: Include git SHA
-        "git_sha": compute_git_sha(),
-    }
+    metrics = compute_classification_metrics(y_true, y_score, slices=slices)
+    metrics["timestamp"] = datetime.now().strftime("%d/%m/%Y, %H:%M:%S")
+    metrics["git_sha"] = compute_git_sha()
+    if cv_summary is not None:
+        metrics["cv"] = cv_summary
 
     with open(output_path, "w") as f:
         json.dump(metrics, f)
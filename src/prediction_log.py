@@ -0,0 +1,214 @@
+# Append-only columnar log of served predictions (request id, probability, latency, errors)
+# Rows are buffered in memory and written in segments by a background thread, off the request path
+
+import os
+import sys
+import glob
+import atexit
+import queue
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+PREDICTION_LOG_DIR = os.environ.get("PREDICTION_LOG_DIR", "data/prediction_log")
+SEGMENT_ROWS = 4096  # Max rows per segment file
+FLUSH_INTERVAL_SECONDS = 30.0  # Max time a row waits in memory (bounds segments per hour at low traffic)
+FLUSH_TIMEOUT_SECONDS = 30.0  # flush() gives up after this long instead of blocking the caller forever
+
+# Column name -> dtype of each segment
+SEGMENT_SCHEMA = {
+    "request_id": object,  # Any length, stored as UTF-8 bytes (request_id_data) + end offsets (request_id_offsets)
+    "ts": np.float64,  # Epoch seconds (UTC)
+    "churn_likelihood": np.float32,  # NaN when the request failed
+    "churn_class": np.int8,  # -1 when the request failed
+    "latency_ms": np.float32,
+    "error": np.bool_,
+}
+
+
+class PredictionLogger:
+    """
+    Asynchronous prediction logger.
+
+    log() only enqueues a tuple; a writer thread groups rows into numpy column arrays and stores
+    them as immutable .npz segments named part-<first_ms>-<last_ms>-<pid>-<seq>.npz, so that readers
+    can skip whole segments by time without opening them.
+    """
+
+    def __init__(
+        self,
+        log_dir: str = PREDICTION_LOG_DIR,
+        model_version: str = "N/A",
+        segment_rows: int = SEGMENT_ROWS,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+    ):
+        self.log_dir = log_dir
+        self.model_version = model_version
+        self.segment_rows = segment_rows
+        self.flush_interval = flush_interval
+        self._segment_seq = 0
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="prediction-log-writer", daemon=True)
+        self._writer.start()
+
+    def log(
+        self,
+        request_id: str,
+        ts: float,
+        churn_likelihood: float,
+        churn_class: int,
+        latency_ms: float,
+        error: bool = False,
+    ) -> None:
+        """
+        Queue a served prediction (or failed request) for writing.
+
+        Parameters
+        ----------
+        request_id: str
+            Id returned to the client, used to join the churn label later
+        ts: float
+            Epoch seconds when the request was received
+        churn_likelihood: float
+            Predicted churn probability (NaN on error)
+        churn_class: int
+            Predicted churn class (-1 on error)
+        latency_ms: float
+            Time spent serving the request
+        error: bool
+            Whether the request failed
+
+        Returns:
+            None
+        """
+        self._queue.put((request_id, ts, churn_likelihood, churn_class, latency_ms, error))
+
+    def _write_loop(self) -> None:
+        rows, stop = [], False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = ()  # Timeout: flush what is buffered
+
+            written = None
+            if item is None:
+                stop = True
+            elif isinstance(item, threading.Event):
+                written = item
+            elif item:
+                rows.append(item)
+                if len(rows) < self.segment_rows:
+                    continue
+            try:
+                self._write_segment(rows)
+            except Exception as e:  # Full disk, bad row, ...: drop this segment, keep the writer alive
+                print(f"Prediction log segment not written ({e!r}), {len(rows)} rows dropped", file=sys.stderr)
+            finally:
+                rows = []
+                if written is not None:
+                    written.set()
+
+    def _write_segment(self, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        columns = {
+            name: np.array(values, dtype=dtype)
+            for (name, dtype), values in zip(SEGMENT_SCHEMA.items(), zip(*rows))
+        }
+        # Variable length request ids: no length limit and no padding to the longest id
+        encoded = [str(request_id).encode("utf-8") for request_id in columns.pop("request_id")]
+        columns["request_id_data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        columns["request_id_offsets"] = np.cumsum([len(request_id) for request_id in encoded], dtype=np.int64)
+        columns["model_version"] = np.array(self.model_version)
+
+        first_ms, last_ms = int(columns["ts"].min() * 1000), int(columns["ts"].max() * 1000)
+        name = f"part-{first_ms}-{last_ms}-{os.getpid()}-{self._segment_seq:06d}.npz"
+        self._segment_seq += 1
+
+        # Write then rename, readers never see a partial segment
+        tmp_path = os.path.join(self.log_dir, f".{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, os.path.join(self.log_dir, name))
+
+    def flush(self, timeout: Optional[float] = FLUSH_TIMEOUT_SECONDS) -> bool:
+        """
+        Block until every row logged before this call is written (or failed to be written).
+
+        Returns:
+            bool: False if the writer is not running or did not catch up within timeout seconds
+        """
+        if not self._writer.is_alive():
+            return False
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def close(self) -> None:
+        """Write buffered rows and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+
+@lru_cache(maxsize=1)
+def get_prediction_logger(model_version: str = "N/A") -> PredictionLogger:
+    """
+    Default prediction logger, created on first use.
+
+    Returns:
+        PredictionLogger: Logger writing to PREDICTION_LOG_DIR
+    """
+    logger = PredictionLogger(PREDICTION_LOG_DIR, model_version=model_version)
+    atexit.register(logger.close)  # Do not lose buffered rows on shutdown
+    return logger
+
+
+def read_request_ids(segment) -> np.ndarray:
+    """Decode the request ids of a segment (UTF-8 data + end offsets)"""
+    data, ends = segment["request_id_data"].tobytes(), segment["request_id_offsets"]
+    starts = np.concatenate([[0], ends[:-1]])
+    return np.array([data[start:end].decode("utf-8") for start, end in zip(starts, ends)], dtype=object)
+
+
+def read_prediction_log(log_dir: str = PREDICTION_LOG_DIR, since: Optional[float] = None) -> pd.DataFrame:
+    """
+    Read the prediction log into a DataFrame.
+
+    Parameters
+    ----------
+    log_dir: str
+        Directory with the log segments
+    since: Optional[float]
+        Epoch seconds. Segments ending before it are skipped and older rows are dropped
+
+    Returns:
+        pd.DataFrame: One row per request with the SEGMENT_SCHEMA columns and model_version
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "part-*.npz"))):
+        last_ms = int(os.path.basename(path).split("-")[2])
+        if since is not None and (last_ms + 1) / 1000 <= since:
+            continue
+        with np.load(path) as segment:
+            frame = pd.DataFrame(
+                {name: read_request_ids(segment) if name == "request_id" else segment[name] for name in SEGMENT_SCHEMA}
+            )
+            frame["model_version"] = str(segment["model_version"])
+        frames.append(frame)
+
+    if not frames:
+        empty = {name: np.array([], dtype=dtype) for name, dtype in SEGMENT_SCHEMA.items()}
+        frames = [pd.DataFrame(empty).assign(model_version="")]
+
+    predictions = pd.concat(frames, ignore_index=True)
+    if since is not None:
+        predictions = predictions[predictions["ts"] >= since]
+    return predictions.reset_index(drop=True)
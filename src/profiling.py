@@ -0,0 +1,143 @@
+# Stage level profiling: wall time, CPU time and RSS growth per pipeline stage
+# Optional tracemalloc peak memory, cProfile (.prof) dumps and top allocations per stage
+
+import os
+import json
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+try:  # Unix only, the peak RSS fields are left out of the records elsewhere
+    import resource
+except ImportError:
+    resource = None
+
+TOP_ALLOCATIONS = 10  # tracemalloc lines reported per stage when dumps are enabled
+PAGE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process from /proc (Linux), None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_BYTES / 2**20
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process since it started, None without the resource module"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10  # Linux: KiB
+
+
+class StageProfiler:
+    """
+    Record wall time, CPU time and memory of named stages.
+
+    Memory is always recorded from the process RSS at the stage boundaries, which costs nothing:
+    rss_delta_mb (RSS kept by the stage) and max_rss_increase_mb (how far the stage raised the
+    process peak RSS, 0 if it stayed under the peak of an earlier stage). process_max_rss_mb is the
+    peak of the whole process so far, not of the stage.
+
+    The exact peak of each stage (peak_memory_mb, Python and numpy allocations) is measured with
+    tracemalloc, which slows allocation heavy code down and skews the timings, so it is off unless
+    trace_memory is set. A disabled profiler adds no overhead: stage() just yields.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        trace_memory: bool = False,
+        dump_dir: Optional[str] = None,
+    ):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.dump_dir = dump_dir
+        self.stages: dict[str, dict] = {}
+        if enabled and dump_dir is not None:
+            os.makedirs(dump_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profile the code run inside the context.
+
+        Yields the stage record, so that the caller can add its own fields (e.g. cache_hit).
+
+        Parameters
+        ----------
+        name: str
+            Stage name, e.g. "split_data"
+
+        Example:
+            >>> profiler = StageProfiler()
+            >>> with profiler.stage("split_data") as record:
+            ...     model_trainer.split_data()
+        """
+        record = {}
+        if not self.enabled:
+            yield record
+            return
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_start, _ = tracemalloc.get_traced_memory()
+        profiler = cProfile.Profile() if self.dump_dir is not None else None
+
+        rss_start, max_rss_start = current_rss_mb(), max_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_s"] = time.perf_counter() - wall_start
+            record["cpu_s"] = time.process_time() - cpu_start
+            if self.trace_memory:
+                _, memory_peak = tracemalloc.get_traced_memory()
+                record["peak_memory_mb"] = (memory_peak - memory_start) / 2**20
+            rss_end, max_rss_end = current_rss_mb(), max_rss_mb()
+            if rss_start is not None and rss_end is not None:
+                record["rss_delta_mb"] = rss_end - rss_start
+            if max_rss_start is not None:
+                record["max_rss_increase_mb"] = max_rss_end - max_rss_start
+                record["process_max_rss_mb"] = max_rss_end
+
+            if profiler is not None:
+                profile_path = os.path.join(self.dump_dir, f"{name}.prof")
+                profiler.dump_stats(profile_path)
+                record["cprofile"] = profile_path
+                if self.trace_memory:
+                    record["top_allocations"] = [
+                        str(stat) for stat in tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+                    ]
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages[name] = record
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: {"stages": {name: record}, "total": {"wall_s", "cpu_s"}}
+        """
+        return {
+            "stages": self.stages,
+            "total": {
+                "wall_s": sum(record["wall_s"] for record in self.stages.values()),
+                "cpu_s": sum(record["cpu_s"] for record in self.stages.values()),
+            },
+        }
+
+    def save(self, output_path: str) -> None:
+        """Save the report as JSON"""
+        with open(output_path, "w") as f:
+            json.dump(self.report(), f, indent=4)
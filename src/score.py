@@ -0,0 +1,241 @@
+# Bulk offline scoring of a customer table with the served artifacts
+# CLI: python -m src.score --in customers.parquet --out scores.parquet
+
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .app import load_artifacts, load_model_version
+from .validation import validate_frame
+
+CHUNK_ROWS = 100_000  # Rows read, scored and written at once: bounds memory per worker
+MAX_IN_FLIGHT_PER_WORKER = 2  # Chunks queued per worker, keeps the reader from running ahead
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def is_parquet(path: str) -> bool:
+    return path.endswith(PARQUET_EXTENSIONS)
+
+
+def import_pyarrow():
+    """pyarrow is only needed for parquet files"""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Reading or writing parquet files requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def read_chunks(input_path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or parquet file in chunks of at most chunk_rows rows.
+
+    A file without rows gives one empty chunk (with the file columns), so that its scores file is
+    still written, with the header/schema and no rows.
+
+    Returns:
+        Iterator[pd.DataFrame]: Chunks, in file order
+    """
+    if is_parquet(input_path):
+        pyarrow = import_pyarrow()
+        parquet_file = pyarrow.parquet.ParquetFile(input_path)
+        if parquet_file.metadata.num_rows == 0:  # iter_batches yields nothing
+            yield parquet_file.schema_arrow.empty_table().to_pandas()
+            return
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:  # Yields one empty chunk for a header only CSV
+        yield from pd.read_csv(input_path, chunksize=chunk_rows)
+
+
+class ScoreWriter:
+    """Append scored chunks to a CSV or parquet file (one row group per chunk)"""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.tmp_path = output_path + ".tmp"
+        self._parquet_writer = None
+        self._csv_file = None
+
+    def write(self, scores: pd.DataFrame) -> None:
+        if is_parquet(self.output_path):
+            pyarrow = import_pyarrow()
+            table = pyarrow.Table.from_pandas(scores, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pyarrow.parquet.ParquetWriter(self.tmp_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            header = self._csv_file is None
+            if header:
+                self._csv_file = open(self.tmp_path, "w", newline="")
+            scores.to_csv(self._csv_file, header=header, index=False)
+
+    def close(self, keep: bool = True) -> None:
+        """Finish the file and move it to output_path, or delete it (keep=False, e.g. after a failure)"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+        if self._parquet_writer is None and self._csv_file is None:
+            return
+        if keep:
+            os.replace(self.tmp_path, self.output_path)
+        else:
+            os.remove(self.tmp_path)
+
+
+def score_chunk(chunk: pd.DataFrame, first_row: int, id_columns: tuple = ()) -> pd.DataFrame:
+    """
+    Validate and score a chunk of customers.
+
+    Invalid rows are not scored: churn_likelihood is NaN, churn_class is -1 and error holds the reason.
+
+    Parameters
+    ----------
+    chunk: pd.DataFrame
+        Raw customer rows
+    first_row: int
+        Position of the first row of the chunk in the input file
+    id_columns: tuple
+        Input columns copied to the output (e.g. a customer id)
+
+    Returns:
+        pd.DataFrame: id_columns, row, churn_likelihood, churn_class, error and model_version
+    """
+    churn_model, feature_pipeline = load_artifacts()
+    columns, errors = validate_frame(chunk)
+    valid = errors == ""
+
+    churn_likelihood = np.full(len(chunk), np.nan, dtype=np.float32)
+    churn_class = np.full(len(chunk), -1, dtype=np.int8)
+    if valid.any():
+        features = feature_pipeline.transform(pd.DataFrame({name: values[valid] for name, values in columns.items()}))
+        churn_likelihood[valid] = churn_model.predict_proba(features)[:, 1]
+        churn_class[valid] = churn_model.predict(features)
+
+    scores = pd.DataFrame({column: chunk[column].to_numpy() for column in id_columns})
+    scores["row"] = np.arange(first_row, first_row + len(chunk), dtype=np.int64)
+    scores["churn_likelihood"] = churn_likelihood
+    scores["churn_class"] = churn_class
+    scores["error"] = errors.astype(str)
+    scores["model_version"] = load_model_version()
+    return scores
+
+
+def init_worker() -> None:
+    """Load the artifacts once per worker process (free when forked after the parent loaded them)"""
+    load_artifacts()
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    chunk_rows: int = CHUNK_ROWS,
+    workers: Optional[int] = None,
+    id_columns: tuple = (),
+    progress: bool = False,
+) -> dict:
+    """
+    Score a CSV or parquet customer table chunk by chunk.
+
+    Chunks are scored in a process pool while the next ones are read, and written in input order
+    as soon as they are ready. At most MAX_IN_FLIGHT_PER_WORKER chunks per worker are held in memory,
+    so memory stays flat whatever the number of rows.
+
+    Parameters
+    ----------
+    input_path: str
+        Customers, .csv or .parquet
+    output_path: str
+        Scores, .csv or .parquet
+    chunk_rows: int
+        Rows per chunk
+    workers: Optional[int]
+        Scoring processes (defaults to the number of CPUs), 0 scores in the current process
+    id_columns: tuple
+        Input columns copied to the output
+    progress: bool
+        Print rows/sec to stderr after each chunk
+
+    Returns:
+        dict: rows, invalid_rows, seconds and rows_per_sec
+
+    Example:
+        >>> score_file("data/customer_churn_synth.csv", "scores.parquet")
+    """
+    workers = os.cpu_count() if workers is None else workers
+    load_artifacts()  # Fail fast, and let forked workers inherit the loaded artifacts
+    writer = ScoreWriter(output_path)
+    stats = {"rows": 0, "invalid_rows": 0}
+    start = time.perf_counter()
+
+    def write(scores: pd.DataFrame) -> None:
+        writer.write(scores)
+        stats["rows"] += len(scores)
+        stats["invalid_rows"] += int((scores["churn_class"] == -1).sum())
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"{stats['rows']} rows scored, {stats['rows'] / elapsed:,.0f} rows/sec", file=sys.stderr)
+
+    first_row = 0
+    try:
+        if workers == 0:
+            for chunk in read_chunks(input_path, chunk_rows):
+                write(score_chunk(chunk, first_row, id_columns))
+                first_row += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                in_flight = deque()
+                for chunk in read_chunks(input_path, chunk_rows):
+                    if len(in_flight) >= workers * MAX_IN_FLIGHT_PER_WORKER:
+                        write(in_flight.popleft().result())
+                    in_flight.append(executor.submit(score_chunk, chunk, first_row, id_columns))
+                    first_row += len(chunk)
+                while in_flight:
+                    write(in_flight.popleft().result())
+    except BaseException:
+        writer.close(keep=False)
+        raise
+    writer.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
+
+
+def score_cli():
+    """
+    Score a customer table with the served churn model
+    """
+    parser = argparse.ArgumentParser(description="Bulk churn scoring")
+    parser.add_argument("--in", dest="input_path", type=str, required=True, help="Customers, .csv or .parquet")
+    parser.add_argument("--out", dest="output_path", type=str, required=True, help="Scores, .csv or .parquet")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (0: no pool), defaults to the CPU count")
+    parser.add_argument("--id-col", dest="id_columns", action="append", default=[], help="Input column copied to the output, repeatable")
+    args = parser.parse_args()
+
+    stats = score_file(
+        args.input_path,
+        args.output_path,
+        chunk_rows=args.chunk_rows,
+        workers=args.workers,
+        id_columns=tuple(args.id_columns),
+        progress=True,
+    )
+    print(
+        f"Scored {stats['rows']} rows ({stats['invalid_rows']} invalid) in {stats['seconds']:.1f}s: "
+        f"{stats['rows_per_sec']:,.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    score_cli()
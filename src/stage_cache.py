@@ -0,0 +1,162 @@
+# Content-addressed cache of training stages: restore unchanged stages instead of recomputing them
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+
+from .metrics import compute_git_sha
+
+STAGE_CACHE_DIR = os.environ.get("CHURN_STAGE_CACHE_DIR", ".cache/stages")
+STAGE_CACHE_MAX_BYTES = int(os.environ.get("CHURN_STAGE_CACHE_MAX_BYTES", 1024**3))
+SOURCE_DIR = Path(__file__).parent  # Uncommitted changes to src/ also invalidate the cache
+HASH_CHUNK_BYTES = 1 << 20
+MISSING = object()
+
+
+def hash_file(path: str) -> str:
+    """sha256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_code_version() -> dict[str, str]:
+    """
+    Code version of the training stages: git commit, hash of the src/ sources and library versions.
+
+    Returns:
+        dict: git_sha, source_sha256 and the sklearn, numpy and pandas versions
+    """
+    import numpy
+    import pandas
+    import sklearn
+
+    digest = hashlib.sha256()
+    for path in sorted(SOURCE_DIR.rglob("*.py")):
+        digest.update(str(path.relative_to(SOURCE_DIR)).encode("utf-8"))
+        digest.update(path.read_bytes())
+    return {
+        "git_sha": compute_git_sha(),
+        "source_sha256": digest.hexdigest(),
+        "sklearn": sklearn.__version__,
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def compute_stage_key(data_path: str, config: dict, code_version: Optional[dict] = None) -> str:
+    """
+    Hash the input data, the training config and the code version.
+
+    Parameters
+    ----------
+    data_path: str
+        Training CSV (hashed by content, not by path or mtime)
+    config: dict
+        JSON-serializable training config (model and its params, CV folds, seeds, ...)
+    code_version: Optional[dict]
+        See compute_code_version (computed when None)
+
+    Returns:
+        str: sha256 hex digest
+    """
+    digest_input = json.dumps(
+        {
+            "data": hash_file(data_path),
+            "config": config,
+            "code": compute_code_version() if code_version is None else code_version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(digest_input.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Directory of joblib files, one per (run key, stage), with least recently used eviction by size.
+    """
+
+    def __init__(self, key: str, path: Optional[str] = None, max_bytes: int = STAGE_CACHE_MAX_BYTES):
+        self.key = key
+        self.path = Path(STAGE_CACHE_DIR if path is None else path)
+        self.max_bytes = max_bytes
+        self.hits: list[str] = []
+        self.misses: list[str] = []
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, stage: str) -> Path:
+        return self.path / f"{self.key[:32]}-{stage}.joblib"
+
+    def get(self, stage: str) -> Any:
+        """
+        Load the cached state of a stage. Unreadable entries are removed and count as misses.
+
+        Returns:
+            Any: Stored state, or MISSING
+        """
+        path = self.entry_path(stage)
+        try:
+            state = joblib.load(path)
+            os.utime(path)  # Last access time, for eviction
+        except FileNotFoundError:
+            state = MISSING
+        except Exception:  # Truncated file, pickle from an incompatible library version, ...
+            path.unlink(missing_ok=True)
+            state = MISSING
+        (self.misses if state is MISSING else self.hits).append(stage)
+        return state
+
+    def put(self, stage: str, state: Any) -> None:
+        """Store the state of a stage (atomic write), then evict the least recently used entries"""
+        path = self.entry_path(stage)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        entries = [(entry.stat(), entry) for entry in self.path.glob("*.joblib")]
+        total_bytes = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in sorted(entries, key=lambda item: item[0].st_mtime):
+            if total_bytes <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total_bytes -= stat.st_size
+
+    def run(self, stage: str, owner: Any, attributes: tuple[str, ...]) -> bool:
+        """
+        Restore owner attributes set by a stage, or run the stage method and store them.
+
+        Parameters
+        ----------
+        stage: str
+            Name of the owner method to run
+        owner: Any
+            Object running the stage (e.g. ChurnModelTrainer)
+        attributes: tuple[str, ...]
+            Attributes written by the stage (stored together: shared objects stay shared)
+
+        Returns:
+            bool: Whether the stage was restored from the cache
+        """
+        state = self.get(stage)
+        if state is MISSING:
+            getattr(owner, stage)()
+            self.put(stage, {name: getattr(owner, name) for name in attributes})
+            return False
+        for name, value in state.items():
+            setattr(owner, name, value)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Stages restored and recomputed in this run"""
+        return {"hits": list(self.hits), "misses": list(self.misses)}
@@ -1,42 +1,107 @@
 # CLI: python -m src.train --data data/customer_churn_synth.csv --outdir artifacts/
 
-# SHAP for feature importance
-import shap
-from shap import KernelExplainer, Explainer
-
 # Data and CLI management
 import os
-import json
+import shutil
 import joblib
-import pickle as pkl
 import argparse 
+import importlib
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from typing import Optional
 
 # ML
 from abc import ABC  # Abstract Classes
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from sklearn.base import clone
 from sklearn.pipeline import Pipeline  # Inference inference_pipeline
-from sklearn.linear_model import LogisticRegressionCV
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split
-from xgboost import XGBClassifier
-from lightgbm import LGBMClassifier
+from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.preprocessing import StandardScaler
 
 # Local modules
-from .metrics import save_metrics
-from .features import build_feature_pipeline
+from .metrics import compute_classification_metrics, save_metrics
+from .features import DERIVED_FEATURES, build_feature_pipeline
+from .profiling import StageProfiler
+from .compact_artifacts import COMPACT_DIRNAME, export_compact_artifacts
+from .stage_cache import StageCache, compute_stage_key
 
 # Config vars
 RANDOM_SEED = 42
 OUTPUT_VAR = "churned"
 MODELS = {
-    "logistic_reg": LogisticRegressionCV(),
-    "xgboost": XGBClassifier(),
-    "random_forest": RandomForestClassifier(),
-    "lgb": LGBMClassifier(),
-}
+    "logistic_reg": ("sklearn.linear_model", "LogisticRegressionCV"),
+    "xgboost": ("xgboost", "XGBClassifier"),
+    "random_forest": ("sklearn.ensemble", "RandomForestClassifier"),
+    "lgb": ("lightgbm", "LGBMClassifier"),
+}  # (module, class) pairs, imported only when the model is chosen
+TRAINING_STAGES = (
+    "split_data",
+    "preprocess_data",
+    "cross_validate",
+    "train",
+    "log_metrics",
+    "save_model",
+    "compute_shap_values",
+    "save_shap_values",
+    "save_shap_plot",
+)  # save_artifacts = save_model + compute_shap_values + save_shap_values + save_shap_plot
+CACHED_STAGES = {
+    "split_data": ("arrays",),
+    "cross_validate": ("cv_results",),
+    "train": ("feature_pipeline", "model", "inference_pipeline"),
+    "compute_shap_values": ("shap_features", "shap_values"),
+}  # Stage -> attributes it sets, restored by the stage cache. Stages writing artifacts always run
+CV_METRICS = ("roc_auc", "pr_auc", "acc", "log_loss", "brier", "ece")  # Reported as mean/std over folds
+
+
+def build_model(model: str):
+    """
+    Import and initialize the classification model registered under the given name.
+
+    Parameters
+    ----------
+    model: str
+        Key of MODELS, e.g. "logistic_reg"
+
+    Returns:
+        Unfitted classifier
+    """
+    module_name, class_name = MODELS[model]
+    return getattr(importlib.import_module(module_name), class_name)()
+
+def transform_fold(feature_pipeline, X: pd.DataFrame, y: np.ndarray, train_index: np.ndarray, val_index: np.ndarray) -> dict:
+    """
+    Fit a copy of the feature pipeline on the fold train rows and transform both sides of the fold.
+
+    Returns:
+        dict: X_train, y_train, X_val, y_val (transformed matrices) and val_index
+    """
+    feature_pipeline = clone(feature_pipeline)
+    return {
+        "X_train": feature_pipeline.fit_transform(X.iloc[train_index]),
+        "y_train": y[train_index],
+        "X_val": feature_pipeline.transform(X.iloc[val_index]),
+        "y_val": y[val_index],
+        "val_index": val_index,
+    }
+
+
+def fit_fold(model, fold: dict, n_threads: int) -> np.ndarray:
+    """
+    Fit a copy of the model on a transformed fold, using at most n_threads threads (BLAS, OpenMP, n_jobs).
+
+    Returns:
+        np.ndarray: Churn probabilities of the fold validation rows
+    """
+    model = clone(model)
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_threads)
+    with threadpool_limits(limits=n_threads):
+        model.fit(fold["X_train"], fold["y_train"])
+        return model.predict_proba(fold["X_val"])[:, 1]
+
 
 #  Abstract Class for ML Pipeline tasks (split, feature pipeline, inference, train, etc.) 
 class MLClassifier(ABC):
@@ -58,8 +123,53 @@ class MLClassifier(ABC):
             "y_train": y_train.values.ravel(),
             "y_val": y_val.values.ravel(),
         }
+        if self.cv_folds:
+            # Cross-validation uses every row, the final model is refit on all of them
+            self.arrays["X"], self.arrays["y"] = X, y.values.ravel()
+
+    def cross_validate(self) -> None:
+        """
+        Stratified k-fold CV (when cv_folds is set): out-of-fold scores and metrics per fold.
+
+        The feature pipeline is fit on the train rows of each fold (in threads), then the folds are
+        fit in parallel processes, each limited to its share of the CPU threads.
+        """
+        if not self.cv_folds:
+            return
+        X, y = self.arrays["X"], self.arrays["y"]
+        n_jobs = min(self.cv_folds, os.cpu_count() or 1)
+        n_threads = max(1, (os.cpu_count() or 1) // n_jobs)
+
+        folds = StratifiedKFold(self.cv_folds, shuffle=True, random_state=RANDOM_SEED).split(X, y)
+        fold_arrays = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(transform_fold)(self.feature_pipeline, X, y, train_index, val_index)
+            for train_index, val_index in folds
+        )
+        fold_scores = Parallel(n_jobs=n_jobs)(
+            delayed(fit_fold)(self.model, fold, n_threads) for fold in fold_arrays
+        )
+
+        oof_scores = np.empty(len(y), dtype=np.float64)
+        per_fold = []
+        for fold, scores in zip(fold_arrays, fold_scores):
+            oof_scores[fold["val_index"]] = scores
+            fold_metrics = compute_classification_metrics(fold["y_val"], scores, curve_points=None)
+            per_fold.append({name: fold_metrics[name] for name in CV_METRICS})
+
+        summary = {"folds": self.cv_folds, "mean": {}, "std": {}, "per_fold": per_fold}
+        for name in CV_METRICS:
+            values = [metrics[name] for metrics in per_fold if metrics[name] is not None]
+            summary["mean"][name] = float(np.mean(values)) if values else None
+            summary["std"][name] = float(np.std(values)) if values else None
+        self.cv_results = {"oof_scores": oof_scores, "summary": summary}
 
     def save_artifacts(self) -> None:
+        self.save_model()
+        self.compute_shap_values()
+        self.save_shap_values()
+        self.save_shap_plot()
+
+    def save_model(self) -> None:
         try:
             assert self.model is not None
         except:
@@ -67,30 +177,51 @@ class MLClassifier(ABC):
                 "There is no ML model trained, please try to run .train() before saving artifacts."
             )
 
-        X_val = self.arrays["X_val"]
-
         # 1. Save Model and feature_pipeline
         joblib.dump(self.model, self.artifact_paths["model"])
         joblib.dump(self.feature_pipeline, self.artifact_paths["feature_pipeline"])
 
+        # 2. Compact format (raw arrays + manifest) preferred by the API, when the model supports it
+        try:
+            export_compact_artifacts(self.model, self.feature_pipeline, self.artifact_paths["compact"])
+        except ValueError as e:
+            print(f"Compact artifacts not exported ({e}), the API will load the pickles")
+            shutil.rmtree(self.artifact_paths["compact"], ignore_errors=True)  # Never serve a stale export
+
+    def compute_shap_values(self) -> None:
+        # SHAP is only needed here, keep it out of the import path
+        import shap
+
+        if self.cv_folds:
+            # The final model was refit on every row, there is no holdout: explain a sample of all rows
+            X = self.arrays["X"]
+            X_sample = X.sample(min(self.shap_n_samples, len(X)), random_state=RANDOM_SEED)
+        else:
+            X_sample = self.arrays["X_val"].iloc[: self.shap_n_samples]
+
         # 2. Compute and save feature importance with SHAP
-        X_val_sample = X_val.iloc[: self.shap_n_samples]
-        X_val_enc = pd.DataFrame(
-            self.inference_pipeline.named_steps["features"].transform(X_val_sample),
+        self.shap_features = pd.DataFrame(
+            self.inference_pipeline.named_steps["features"].transform(X_sample),
             columns=self.inference_pipeline.named_steps[
                 "features"
             ].get_feature_names_out(),
         )
 
-        self.shap_explainer = Explainer(
-            self.inference_pipeline.named_steps["model"], X_val_enc
+        self.shap_explainer = shap.Explainer(
+            self.inference_pipeline.named_steps["model"], self.shap_features
         )
-        self.shap_values = self.shap_explainer(X_val_enc)
+        self.shap_values = self.shap_explainer(self.shap_features)
 
-        shap_df = pd.DataFrame(self.shap_values.values, columns=X_val_enc.columns)
+    def save_shap_values(self) -> None:
+        shap_df = pd.DataFrame(self.shap_values.values, columns=self.shap_features.columns)
         shap_df.to_csv(self.artifact_paths["feature_importances"], index=False)
 
-        shap.summary_plot(self.shap_values.values, X_val_enc, show=False)
+    def save_shap_plot(self) -> None:
+        # SHAP and matplotlib are only needed here, keep them out of the import path
+        import shap
+        import matplotlib.pyplot as plt
+
+        shap.summary_plot(self.shap_values.values, self.shap_features, show=False)
 
         fig = plt.gcf()
         fig.suptitle("SHAP Summary Plot - Customer Churn Model", fontsize=16, y=1.02)
@@ -114,30 +245,48 @@ class MLClassifier(ABC):
             col for col in self.input_cols if col not in self.cat_features
         ]
 
-        self.feature_pipeline = build_feature_pipeline(OneHotEncoder(handle_unknown="ignore"), self.scaler, self.cat_features, self.num_features)
+        self.feature_pipeline = build_feature_pipeline(
+            OneHotEncoder(handle_unknown="ignore"),
+            self.scaler,
+            self.cat_features,
+            self.num_features,
+            derived_features=DERIVED_FEATURES,
+        )
 
     def hpo(self) -> None:
         pass
 
     def log_metrics(self) -> None:
+        if self.cv_folds:
+            # Out-of-fold predictions cover every row: metrics over the whole dataset, plus mean/std per fold
+            X = self.arrays["X"]
+            save_metrics(
+                self.cv_results["oof_scores"],
+                self.arrays["y"],
+                self.artifact_paths["metrics"],
+                slices=X[self.cat_features],
+                cv_summary=self.cv_results["summary"],
+            )
+            return
+
         X_train = self.arrays["X_train"]
         X_val = self.arrays["X_val"]
         y_train = self.arrays["y_train"]
         y_val = self.arrays["y_val"]
-        y_hat = self.inference_pipeline.predict(X_val)
+        y_score = self.inference_pipeline.predict_proba(X_val)[:, 1]
 
-        # Compute performance metrics on val
-        save_metrics(y_hat, y_val, self.artifact_paths["metrics"])
+        # Compute performance metrics on val (overall and per categorical slice)
+        save_metrics(y_score, y_val, self.artifact_paths["metrics"], slices=X_val[self.cat_features])
 
 
 #  Subclass for customer churn use case
 class ChurnModelTrainer(MLClassifier):
-    def __init__(self, data_path, output_dir, model="logistic_reg"):
+    def __init__(self, data_path, output_dir, model="logistic_reg", cv_folds: Optional[int] = None):
         self.data_path: str = data_path  # TODO: Add try except
         self.input_data: pd.DataFrame = pd.read_csv(self.data_path)
         self.output_dir: str = output_dir
         self.target_var: str = OUTPUT_VAR
-        self.model = MODELS[model]  # Initialize Classification Model
+        self.model = build_model(model)  # Initialize Classification Model
         self.arrays: dict = None
         self.input_cols = [col for col in self.input_data if col != self.target_var]
         self.ouput_cols = [col for col in self.input_data if col == self.target_var]
@@ -150,6 +299,8 @@ class ChurnModelTrainer(MLClassifier):
             "feature_pipeline": "feature_pipeline.pkl",
             "feature_importances": "feature_importances.csv",
             "metrics": "metrics.json",
+            "training_profile": "training_profile.json",
+            "compact": COMPACT_DIRNAME,
         }
         self.artifact_paths = {
             key: os.path.join(self.output_dir, value)
@@ -160,15 +311,20 @@ class ChurnModelTrainer(MLClassifier):
         self.num_features: list = []
         self.shap_explainer = None
         self.shap_values = None
+        self.shap_features = None
         self.shap_n_samples = 100
         self.feature_pipeline = None
         self.inference_pipeline = None
+        self.cv_folds = cv_folds  # None: single train/val split
+        self.cv_results = None
 
     def train(self):
         X_train = self.arrays["X_train"]
         X_val = self.arrays["X_val"]
         y_train = self.arrays["y_train"]
         y_val = self.arrays["y_val"]
+        if self.cv_folds:  # Refit on all rows, the metrics come from the CV folds
+            X_train, y_train = self.arrays["X"], self.arrays["y"]
 
         self.feature_pipeline.fit(X_train)
         self.inference_pipeline = Pipeline(
@@ -181,7 +337,15 @@ class ChurnModelTrainer(MLClassifier):
 
 
 
-def train(data: str, output_dir: str) -> None:
+def train(
+    data: str,
+    output_dir: str,
+    profile: bool = False,
+    profile_memory: bool = False,
+    profile_dumps: bool = False,
+    cv_folds: Optional[int] = None,
+    use_cache: bool = True,
+) -> None:
     """
     Run training inference pipeline.
 
@@ -191,19 +355,60 @@ def train(data: str, output_dir: str) -> None:
         Path to customer data
     output_dir : str
         Path to artifacts dir, used to save the feature pipeline, trained model and shap values
+    profile : bool
+        Record wall time, CPU time and RSS growth per stage in training_profile.json. Stages
+        restored from the stage cache are marked with cache_hit (their timings are not the stage
+        cost, see use_cache)
+    profile_memory : bool
+        Also record the tracemalloc peak memory per stage (slows the stages down, timings are inflated)
+    profile_dumps : bool
+        Also save a cProfile dump per stage (in output_dir/profile/), plus the top memory
+        allocations when profile_memory is set
+    cv_folds : Optional[int]
+        Stratified k-fold cross-validation (metrics.json gets out-of-fold metrics and mean/std per
+        fold) and final fit on all rows. SHAP values then explain a random sample of all rows, as
+        the final model has no holdout. None keeps the single 67/33 split (SHAP on validation rows)
+    use_cache : bool
+        Restore the stages in CACHED_STAGES from the stage cache (CHURN_STAGE_CACHE_DIR) when the
+        data, config and code are unchanged. Artifacts are written either way
     
     Returns:
         None: saves artifacts in output dir
     """
+    profiler = StageProfiler(
+        enabled=profile or profile_memory or profile_dumps,
+        trace_memory=profile_memory,
+        dump_dir=os.path.join(output_dir, "profile") if profile_dumps else None,
+    )
+
     # Initialize ML Personalized Class for churn
-    model_trainer = ChurnModelTrainer(data, output_dir)
+    with profiler.stage("load_data"):
+        model_trainer = ChurnModelTrainer(data, output_dir, cv_folds=cv_folds)
+
+    cache = None
+    if use_cache:
+        config = {
+            "model": repr(model_trainer.model),
+            "cv_folds": cv_folds,
+            "random_seed": RANDOM_SEED,
+            "shap_n_samples": model_trainer.shap_n_samples,
+        }
+        cache = StageCache(compute_stage_key(data, config))
 
     # Run Training Inference Pipeline
-    model_trainer.split_data()
-    model_trainer.preprocess_data()
-    model_trainer.train()
-    model_trainer.log_metrics()  
-    model_trainer.save_artifacts()
+    for stage in TRAINING_STAGES:
+        with profiler.stage(stage) as record:
+            if cache is not None and stage in CACHED_STAGES:
+                record["cache_hit"] = cache.run(stage, model_trainer, CACHED_STAGES[stage])  # Timings of hits are not the stage cost
+            else:
+                getattr(model_trainer, stage)()
+                record["cache_hit"] = False
+
+    if cache is not None and cache.hits:
+        print(f"Stages restored from the cache: {', '.join(cache.hits)}")
+
+    if profiler.enabled:
+        profiler.save(model_trainer.artifact_paths["training_profile"])
 
 def train_cli():
     """
@@ -213,11 +418,16 @@ def train_cli():
     parser = argparse.ArgumentParser(description="Train Churn Model")
     parser.add_argument("--data", type=str, required=True, help="Path to CSV file")
     parser.add_argument("--outdir", type=str, required=True, help="Path to CSV file")
+    parser.add_argument("--profile", action="store_true", help="Save training_profile.json (time and RSS per stage), use with --no-cache")
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace the exact peak memory per stage (slower)")
+    parser.add_argument("--profile-dumps", action="store_true", help="Also save cProfile dumps per stage")
+    parser.add_argument("--cv-folds", type=int, default=None, help="Stratified k-fold CV, then refit on all rows")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every stage (ignore the stage cache)")
     args = parser.parse_args()
     data, output_dir = (args.data, args.outdir)
     
     # Run training
-    train(data, output_dir) 
+    train(data, output_dir, profile=args.profile, profile_memory=args.profile_memory, profile_dumps=args.profile_dumps, cv_folds=args.cv_folds, use_cache=not args.no_cache)
 
 if __name__ == "__main__":
     train_cli()
\ No newline at end of file
@@ -0,0 +1,176 @@
+# Validation of customer rows with the PredictModel rules (Literal values, numbers, required fields)
+# Vectorized for bulk scoring, precompiled per-field checks for request payloads: Pydantic only on errors
+
+import typing
+from typing import Any, List, Literal
+
+import numpy as np
+import pandas as pd
+from pydantic import TypeAdapter
+
+from .io_schemas import PredictModel
+
+
+def build_field_specs(model: type = PredictModel) -> dict[str, dict]:
+    """
+    Derive the validation rules from the Pydantic model annotations.
+
+    Returns:
+        dict: field name -> {"allowed": tuple of Literal values (None for numeric fields), "required", "default"}
+    """
+    specs = {}
+    for name, field in model.model_fields.items():
+        literals = [
+            arg for arg in typing.get_args(field.annotation) if typing.get_origin(arg) is Literal
+        ]
+        specs[name] = {
+            "allowed": typing.get_args(literals[0]) if literals else None,
+            "required": field.is_required(),
+            "default": None if field.is_required() else field.default,
+        }
+    return specs
+
+
+FIELD_SPECS = build_field_specs()
+CATEGORICAL_FIELDS = tuple(name for name, spec in FIELD_SPECS.items() if spec["allowed"] is not None)
+NUMERIC_FIELDS = tuple(name for name, spec in FIELD_SPECS.items() if spec["allowed"] is None)
+
+
+def validate_frame(frame: pd.DataFrame) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """
+    Validate a chunk of customer rows column by column.
+
+    Missing required columns reject the whole chunk (ValueError), missing optional columns take
+    their default. Invalid values only reject their row: categorical values outside the Literal
+    choices, non numeric values and missing numeric values (the model cannot score them).
+    Missing categorical values are accepted, as in PredictModel.
+
+    Parameters
+    ----------
+    frame: pd.DataFrame
+        Raw customer rows (extra columns are ignored)
+
+    Returns:
+        tuple: (columns, errors) with columns a dict field -> np.ndarray (object for categoricals,
+        float64 for numbers) and errors the first error message of each row ("" when valid)
+    """
+    missing = [name for name, spec in FIELD_SPECS.items() if spec["required"] and name not in frame]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    n_rows = len(frame)
+    errors = np.full(n_rows, "", dtype=object)
+    columns = {}
+    for name, spec in FIELD_SPECS.items():
+        if name not in frame:
+            values = np.full(n_rows, spec["default"], dtype=object if spec["allowed"] else np.float64)
+            columns[name] = values
+            continue
+
+        raw = frame[name]
+        is_null = raw.isna().to_numpy()
+        if spec["allowed"] is not None:
+            values = raw.to_numpy(dtype=object)
+            values[is_null] = None
+            invalid = ~(is_null | np.isin(values, spec["allowed"]))
+            message = f"{name}: Input should be {' or '.join(repr(value) for value in spec['allowed'])}"
+        else:
+            values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+            invalid = np.isnan(values) | np.isinf(values)
+            message = f"{name}: Input should be a valid number"
+        columns[name] = values
+        errors[invalid & (errors == "")] = message
+    return columns, errors
+
+
+# ----- Request payloads (JSON decoded customers) -----
+
+MISSING = object()
+NUMBER_TYPES = (int, float)  # Exact types: bool and numeric strings go through Pydantic (lax coercion)
+CUSTOMER_ADAPTER = TypeAdapter(PredictModel)
+CUSTOMERS_ADAPTER = TypeAdapter(List[PredictModel])
+# Precompiled checks: (field, accepted categorical values or None for numbers, default or MISSING)
+FIELD_CHECKS = tuple(
+    (
+        name,
+        None if spec["allowed"] is None else frozenset(spec["allowed"]),
+        MISSING if spec["required"] else spec["default"],
+    )
+    for name, spec in FIELD_SPECS.items()
+)
+
+
+def allocate_columns(n_rows: int) -> dict[str, np.ndarray]:
+    """Empty typed columns: object for categoricals, float64 for numbers (NaN for null)"""
+    return {
+        name: np.empty(n_rows, dtype=object if allowed is not None else np.float64)
+        for name, allowed, _ in FIELD_CHECKS
+    }
+
+
+def fill_columns(payloads: list, columns: dict[str, np.ndarray]) -> bool:
+    """
+    Copy customers into the columns when they trivially pass PredictModel validation.
+
+    Returns:
+        bool: False as soon as a customer needs the full Pydantic validation (errors, coercions)
+    """
+    for i, payload in enumerate(payloads):
+        if type(payload) is not dict:
+            return False
+        for name, allowed, default in FIELD_CHECKS:
+            value = payload.get(name, default)
+            if value is None:
+                columns[name][i] = None if allowed is not None else np.nan
+            elif allowed is not None:
+                if type(value) is not str or value not in allowed:
+                    return False
+                columns[name][i] = value
+            elif type(value) in NUMBER_TYPES:
+                columns[name][i] = value
+            else:  # Missing required field, wrong type or numeric string
+                return False
+    return True
+
+
+def validate_customers(payloads: Any, batch: bool = False) -> dict[str, np.ndarray]:
+    """
+    Validate JSON decoded customers into typed columns, with exactly the PredictModel semantics.
+
+    Well-formed customers are checked field by field against the precompiled Literal choices
+    and number types, without building Pydantic models. Anything else goes through Pydantic,
+    which either coerces it (e.g. "20" -> 20) or raises the same ValidationError as before.
+
+    Parameters
+    ----------
+    payloads: Any
+        A customer (dict) or, when batch is True, a list of customers
+    batch: bool
+        Whether payloads is a list of customers
+
+    Returns:
+        dict: field -> np.ndarray with one value per customer
+
+    Raises:
+        pydantic.ValidationError: Same errors as PredictModel (List[PredictModel] for batches)
+    """
+    if batch and type(payloads) is list:
+        rows = payloads
+    elif not batch:
+        rows = [payloads]
+    else:
+        rows = None
+
+    if rows is not None:
+        columns = allocate_columns(len(rows))
+        if fill_columns(rows, columns):
+            return columns
+
+    if batch:
+        customers = CUSTOMERS_ADAPTER.validate_python(payloads, from_attributes=True)
+    else:
+        customers = [CUSTOMER_ADAPTER.validate_python(payloads, from_attributes=True)]
+    rows = [customer.model_dump() for customer in customers]
+    columns = allocate_columns(len(rows))
+    fill_columns(rows, columns)  # Validated values: always pass the fast checks
+    return columns
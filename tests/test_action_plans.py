@@ -0,0 +1,88 @@
+import sqlite3
+import pytest
+from fastapi.testclient import TestClient
+
+from src.action_plans import ActionPlanStore, get_action_plan_store
+from src.app import app
+from src.io_schemas import ActionPlanModel
+
+PLANS = [
+    {"status": "healthy", "findings": [], "actions": ["do_nothing"]},
+    {"status": "warn", "findings": ["p95 latency > 400ms"], "actions": ["raise_thresholds"]},
+    {"status": "critical", "findings": ["ROC-AUC drop 7%"], "actions": ["open_incident", "roll_back_model"], "page_oncall": True},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ActionPlanStore(str(tmp_path / "action_plans.sqlite"), batch_size=8)
+    yield store
+    store.close()
+
+
+def test_store_pages_and_filters_history(store):
+    """Plans are returned newest first, filtered by status and paginated with a cursor"""
+    for i in range(30):
+        store.append(ActionPlanModel(**PLANS[i % 3]))
+
+    first_page = store.query(limit=20)
+    second_page = store.query(limit=20, cursor=first_page["next_cursor"])
+    assert len(first_page["items"]) == 20 and len(second_page["items"]) == 10
+    assert second_page["next_cursor"] is None
+    ids = [item["id"] for item in first_page["items"] + second_page["items"]]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 30
+
+    critical = store.query(status="critical", limit=100)["items"]
+    assert len(critical) == 10
+    assert all(item["status"] == "critical" and item["page_oncall"] for item in critical)
+
+
+def test_store_is_append_only(store):
+    """Stored plans cannot be updated or deleted"""
+    store.append(ActionPlanModel(**PLANS[0]))
+    store.flush()
+    connection = sqlite3.connect(store.path)
+    with pytest.raises(sqlite3.IntegrityError, match="append-only"):
+        connection.execute("DELETE FROM action_plans")
+    connection.close()
+
+
+def test_monitor_endpoint_writes_and_serves_history(store):
+    """POST /monitor stores the plan and GET /monitor serves it back"""
+    app.dependency_overrides[get_action_plan_store] = lambda: store
+    try:
+        client = TestClient(app)
+        for plan in PLANS:
+            response = client.post("/monitor", json=plan)
+            assert response.status_code == 200
+            assert response.json()["status"] == plan["status"]
+
+        response = client.get("/monitor", params={"status": "warn"})
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [item["findings"] for item in items] == [PLANS[1]["findings"]]
+
+        assert client.get("/monitor", params={"status": "unknown"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_store_survives_write_errors(tmp_path):
+    """A failed batch is dropped: reads do not hang and later plans are still stored"""
+    path = str(tmp_path / "action_plans.sqlite")
+    store = ActionPlanStore(path, batch_size=8)
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TRIGGER fail_inserts BEFORE INSERT ON action_plans BEGIN SELECT RAISE(ABORT, 'disk full'); END"
+    )
+    connection.commit()
+
+    store.append(ActionPlanModel(**PLANS[0]))
+    assert store.flush(timeout=10)
+    connection.execute("DROP TRIGGER fail_inserts")
+    connection.commit()
+    connection.close()
+
+    store.append(ActionPlanModel(**PLANS[2]))
+    assert [item["status"] for item in store.query()["items"]] == ["critical"]
+    store.close()
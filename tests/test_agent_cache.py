@@ -0,0 +1,46 @@
+import time
+
+from src.agent_cache import AgentCache, compute_cache_key
+
+SYSTEM_PROMPT = "You are a helpful MLOps assistant"
+ACTION_PLAN = {"status": "warn", "findings": ["ROC-AUC drop"], "actions": ["trigger_retraining"], "page_oncall": False}
+TOOL_CALLS = [{"name": "yaml_saver", "args": {"data": ACTION_PLAN, "file_path": "artifacts/action_plan.yml"}}]
+
+
+def test_cache_key_ignores_meaningless_changes():
+    """Float noise and key order must not change the key, a real metric change must"""
+    inputs = {"metrics": [{"roc_auc": 0.911, "pr_auc": 0.653}], "drift": {"overall_drift": True}}
+    noisy_inputs = {"drift": {"overall_drift": True}, "metrics": [{"pr_auc": 0.6530001, "roc_auc": 0.9110002}]}
+    changed_inputs = {"metrics": [{"roc_auc": 0.861, "pr_auc": 0.653}], "drift": {"overall_drift": True}}
+
+    key = compute_cache_key(SYSTEM_PROMPT, inputs, "gpt-4o")
+    assert key == compute_cache_key(SYSTEM_PROMPT, noisy_inputs, "gpt-4o")
+    assert key != compute_cache_key(SYSTEM_PROMPT, changed_inputs, "gpt-4o")
+    assert key != compute_cache_key(SYSTEM_PROMPT, inputs, "gpt-4o-mini")
+
+
+def test_cache_hit_rate_ttl_and_size_eviction(tmp_path):
+    """Entries are returned until they expire or are evicted, and lookups update the hit rate"""
+    cache = AgentCache(str(tmp_path / "agent_cache.sqlite"), ttl_seconds=60, max_entries=2)
+
+    assert cache.get("a") is None
+    cache.put("a", ACTION_PLAN, TOOL_CALLS)
+    assert cache.get("a") == {"action_plan": ACTION_PLAN, "tool_calls": TOOL_CALLS}
+
+    # "a" was used most recently, so "b" is evicted when "c" exceeds max_entries
+    cache.put("b", ACTION_PLAN, [])
+    time.sleep(0.01)
+    cache.get("a")
+    cache.put("c", ACTION_PLAN, [])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+    assert stats["hit_rate"] == 3 / 5
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    cache.close()
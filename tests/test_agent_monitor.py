@@ -0,0 +1,74 @@
+import json
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+import src.agent_monitor
+from src.agent_cache import AgentCache
+from src.agent_monitor import extract_action_plan, extract_tool_calls, run_react_agent
+
+FIRST_PLAN = {"status": "warn", "findings": ["ROC-AUC drop"], "actions": ["trigger_retraining"], "page_oncall": False}
+FINAL_PLAN = {"status": "critical", "findings": ["ROC-AUC drop", "Drift"], "actions": ["roll_back_model"], "page_oncall": True}
+
+
+def agent_messages() -> list:
+    """Canned ReAct run: a plan is saved, a post fails, a revised plan is posted"""
+    return [
+        AIMessage("", tool_calls=[
+            {"name": "json_reader", "args": {"file_path": "metrics.json"}, "id": "0"},
+            {"name": "json_saver", "args": {"data": FIRST_PLAN, "file_path": "plan.json"}, "id": "1"},
+            {"name": "action_plan_poster", "args": {"action_plan": FIRST_PLAN}, "id": "2"},
+        ]),
+        ToolMessage("{}", tool_call_id="0"),
+        ToolMessage("null", tool_call_id="1"),
+        ToolMessage("Error: connection refused", tool_call_id="2", status="error"),
+        AIMessage("", tool_calls=[{"name": "action_plan_poster", "args": {"action_plan": FINAL_PLAN}, "id": "3"}]),
+        ToolMessage("{}", tool_call_id="3"),
+        AIMessage("The action plan was saved and posted"),
+    ]
+
+
+class StubAgent:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, input, config):
+        self.calls += 1
+        return {"messages": agent_messages()}
+
+
+def test_failed_tool_calls_are_not_recorded_and_the_final_plan_wins():
+    tool_calls = extract_tool_calls(agent_messages())
+
+    assert tool_calls == [
+        {"name": "json_saver", "args": {"data": FIRST_PLAN, "file_path": "plan.json"}},
+        {"name": "action_plan_poster", "args": {"action_plan": FINAL_PLAN}},
+    ]
+    assert extract_action_plan(tool_calls).model_dump() == FINAL_PLAN
+    assert extract_action_plan([{"name": "json_saver", "args": {"data": {"status": "unknown"}}}]) is None
+
+
+def test_cache_miss_records_and_hit_replays_without_the_agent(tmp_path, monkeypatch):
+    """The second run with the same inputs replays the recorded side effects, the LLM is not called"""
+    agent, replayed = StubAgent(), []
+    monkeypatch.setattr(src.agent_monitor, "build_react_agent", lambda: (agent, None))
+    monkeypatch.setattr(src.agent_monitor.time, "sleep", lambda seconds: None)
+    for name in src.agent_monitor.side_effect_tools:
+        monkeypatch.setitem(
+            src.agent_monitor.side_effect_tools, name, lambda name=name, **args: replayed.append((name, args))
+        )
+    (tmp_path / "metrics.json").write_text(json.dumps([{"roc_auc": 0.91}]))
+    (tmp_path / "drift.json").write_text(json.dumps({"overall_drift": True}))
+    paths = (str(tmp_path / "metrics.json"), str(tmp_path / "drift.json"), str(tmp_path / "plan.yaml"))
+    cache = AgentCache(str(tmp_path / "agent_cache.sqlite"))
+
+    assert run_react_agent(*paths, cache=cache).model_dump() == FINAL_PLAN
+    assert agent.calls == 1 and replayed == []  # The agent itself ran the tools on the miss
+
+    assert run_react_agent(*paths, cache=cache).model_dump() == FINAL_PLAN
+    assert agent.calls == 1
+    assert replayed == [
+        ("json_saver", {"data": FIRST_PLAN, "file_path": "plan.json"}),
+        ("action_plan_poster", {"action_plan": FINAL_PLAN}),
+    ]
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+    cache.close()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+import src.app
+from src.compact_artifacts import export_compact_artifacts, load_compact_artifacts
+from src.compiled_trees import CompiledEnsemble, compile_trees
+from src.features import DERIVED_FEATURES, build_feature_pipeline
+
+DATA_PATH = "data/customer_churn_synth.csv"
+OUTPUT_VAR = "churned"
+
+
+@pytest.fixture(scope="module", params=[None, DERIVED_FEATURES], ids=["legacy", "derived"])
+def churn_data(request):
+    data = pd.read_csv(DATA_PATH)
+    X, y = data.drop(columns=OUTPUT_VAR), data[OUTPUT_VAR].values
+    cat_features = X.select_dtypes(include="object").columns.tolist()
+    num_features = [col for col in X if col not in cat_features]
+    feature_pipeline = build_feature_pipeline(
+        OneHotEncoder(handle_unknown="ignore"), StandardScaler(), cat_features, num_features, request.param
+    ).fit(X)
+    return X, y, feature_pipeline
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        LogisticRegression(max_iter=1000),
+        RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0),
+    ],
+    ids=["logistic_reg", "random_forest"],
+)
+def test_compact_artifacts_round_trip(tmp_path, churn_data, model):
+    """The compact model and pipeline reproduce the sklearn outputs"""
+    X, y, feature_pipeline = churn_data
+    model.fit(feature_pipeline.transform(X), y)
+
+    manifest = export_compact_artifacts(model, feature_pipeline, str(tmp_path / "compact"), git_sha="abc123")
+    compact_model, compact_pipeline, loaded_manifest = load_compact_artifacts(str(tmp_path / "compact"))
+
+    assert loaded_manifest == manifest and manifest["git_sha"] == "abc123"
+    features = compact_pipeline.transform(X)
+    np.testing.assert_allclose(features, feature_pipeline.transform(X))
+    np.testing.assert_allclose(compact_model.predict_proba(features), model.predict_proba(features), atol=1e-12)
+    np.testing.assert_array_equal(compact_model.predict(features), model.predict(features))
+
+    # Columns given as a dict of arrays give the same features
+    columns = {col: X[col].to_numpy() for col in X}
+    np.testing.assert_array_equal(compact_pipeline.transform(columns), features)
+
+
+def test_corrupted_compact_artifacts_are_rejected(tmp_path, churn_data):
+    X, y, feature_pipeline = churn_data
+    model = LogisticRegression(max_iter=1000).fit(feature_pipeline.transform(X), y)
+    export_compact_artifacts(model, feature_pipeline, str(tmp_path / "compact"))
+
+    coef_path = tmp_path / "compact" / "coef.bin"
+    coef = bytearray(coef_path.read_bytes())
+    coef[0] ^= 0xFF
+    coef_path.write_bytes(bytes(coef))
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        load_compact_artifacts(str(tmp_path / "compact"))
+
+
+def test_compact_trees_accept_nan_like_sklearn(tmp_path, churn_data):
+    """Missing numeric values follow default_left in forests (as in sklearn), linear models reject them"""
+    X, y, feature_pipeline = churn_data
+    features = feature_pipeline.transform(X)
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(features, y)
+    export_compact_artifacts(model, feature_pipeline, str(tmp_path / "compact"))
+    compact_model, _, _ = load_compact_artifacts(str(tmp_path / "compact"))
+
+    features_with_nan = features[:200].copy()
+    features_with_nan[::3, -1] = np.nan
+    features_with_nan[::5, 0] = np.nan
+    np.testing.assert_allclose(
+        compact_model.predict_proba(features_with_nan), model.predict_proba(features_with_nan), atol=1e-12
+    )
+    np.testing.assert_array_equal(compact_model.predict(features_with_nan), model.predict(features_with_nan))
+
+    features_with_nan[0, 0] = np.inf
+    with pytest.raises(ValueError, match="infinity"):
+        compact_model.predict_proba(features_with_nan)
+
+    linear_model = LogisticRegression(max_iter=1000).fit(features, y)
+    export_compact_artifacts(linear_model, feature_pipeline, str(tmp_path / "linear"))
+    compact_linear, _, _ = load_compact_artifacts(str(tmp_path / "linear"))
+    with pytest.raises(ValueError, match="NaN"):
+        compact_linear.predict_proba(features[:2] * np.nan)
+
+
+def test_compiled_mode_applies_to_compact_trees(tmp_path, churn_data, monkeypatch):
+    """CHURN_INFERENCE_MODE=compiled serves compact forests as compile_trees does with the pickle"""
+    X, y, feature_pipeline = churn_data
+    features = feature_pipeline.transform(X)
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(features, y)
+    export_compact_artifacts(model, feature_pipeline, str(tmp_path / "compact"))
+    monkeypatch.setattr(src.app, "COMPACT_ARTIFACTS_DIR", str(tmp_path / "compact"))
+    monkeypatch.setattr(src.app, "ARTIFACT_FORMAT", "compact")
+    monkeypatch.setattr(src.app, "INFERENCE_MODE", "compiled")
+
+    src.app.load_artifacts.cache_clear()
+    try:
+        churn_model, _ = src.app.load_artifacts()
+    finally:
+        src.app.load_artifacts.cache_clear()
+
+    assert isinstance(churn_model, CompiledEnsemble) and churn_model.value.dtype == np.float32
+    np.testing.assert_array_equal(churn_model.predict_proba(features), compile_trees(model).predict_proba(features))
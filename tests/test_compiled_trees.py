@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.compiled_trees import compare_predictions, compile_trees
+
+
+@pytest.fixture(scope="module")
+def tree_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(4000, 17))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    X[::50, 3] = np.round(X[::50, 3], 1)  # Values on split thresholds
+    return X[:2000], y[:2000], X[2000:]
+
+
+def build_xgboost():
+    xgboost = pytest.importorskip("xgboost")
+    return xgboost.XGBClassifier(n_estimators=50, max_depth=4)
+
+
+def build_lightgbm():
+    lightgbm = pytest.importorskip("lightgbm")
+    return lightgbm.LGBMClassifier(n_estimators=50, verbose=-1)
+
+
+def test_compiled_forest_is_exact(tree_data):
+    """float32 thresholds are rounded down: same splits as sklearn, which compares float32 features"""
+    X_train, y_train, X_test = tree_data
+    model = RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, y_train)
+    compiled = compile_trees(model, value_dtype=np.float64)
+
+    np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    assert compiled.feature.dtype == np.int16 and compiled.threshold.dtype == np.float32
+
+
+@pytest.mark.parametrize("build_model", [build_xgboost, build_lightgbm], ids=["xgboost", "lgb"])
+def test_compiled_boosted_trees_match_the_model(tree_data, build_model):
+    X_train, y_train, X_test = tree_data
+    X_test = X_test.copy()
+    X_test[::7, 5] = np.nan  # Missing values follow the default branch
+    model = build_model().fit(X_train, y_train)
+
+    report = compare_predictions(model, compile_trees(model), X_test)
+
+    assert report["max_abs_diff"] < 1e-5
+    assert report["class_agreement"] == 1.0
+    assert report["compiled_bytes"] < report["model_bytes"]
+
+
+def test_unsupported_models_are_rejected():
+    from sklearn.linear_model import LogisticRegression
+
+    with pytest.raises(ValueError, match="Unsupported model"):
+        compile_trees(LogisticRegression())
@@ -0,0 +1,84 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import src.app
+import src.stage_cache
+from src.derived_features import DERIVED_FEATURES, CompiledDerivedFeatures, DerivedFeature, add_derived_features
+from src.drift import monitor_drift
+from src.io_schemas import PredictModel
+from src.train import train
+
+DATA_PATH = "data/customer_churn_synth.csv"
+INFERENCE_SAMPLE_FILE = "tests/sample.json"
+
+
+def test_compiled_transform_matches_the_definitions():
+    data = pd.read_csv(DATA_PATH).head(200)
+    data.loc[0, "tenure_months"] = -1.0  # Zero denominator
+    data.loc[1, "discount_pct"] = np.nan
+    data.loc[2, "discount_pct"] = 20.0  # On a bin edge
+
+    derived = CompiledDerivedFeatures(DERIVED_FEATURES).transform(data)
+
+    with np.errstate(divide="ignore"):
+        expected = np.column_stack(
+            [
+                data["avg_latency_ms"] * data["downtime_hours_30d"],
+                data["support_tickets_30d"] / (data["tenure_months"] + 1.0),
+                pd.cut(data["discount_pct"], [-np.inf, 10, 20, 30, np.inf], right=False, labels=False),
+            ]
+        )
+    np.testing.assert_array_equal(derived, expected)
+    assert list(add_derived_features(data).columns[-3:]) == [definition.name for definition in DERIVED_FEATURES]
+
+
+def test_invalid_definitions_are_rejected():
+    with pytest.raises(ValueError, match="Unknown operation"):
+        DerivedFeature("x", "log", ("tenure_months",))
+    with pytest.raises(ValueError, match="takes 2 input columns"):
+        DerivedFeature("x", "ratio", ("tenure_months",))
+    definition = DerivedFeature("x", "bucket", ("discount_pct",), bins=(5.0, 10.0))
+    assert DerivedFeature.from_dict(json.loads(json.dumps(definition.to_dict()))) == definition
+
+
+@pytest.mark.parametrize("artifact_format", ["compact", "joblib"])
+def test_predict_with_derived_feature_artifacts(tmp_path_factory, monkeypatch, artifact_format):
+    """A model trained with derived features is served with the same transform (pickled or compact pipeline)"""
+    output_dir = tmp_path_factory.getbasetemp() / "derived_artifacts"
+    if not (output_dir / "model.pkl").exists():
+        output_dir.mkdir(exist_ok=True)
+        monkeypatch.setattr(src.stage_cache, "STAGE_CACHE_DIR", str(output_dir / "cache"))
+        train(DATA_PATH, str(output_dir))
+    monkeypatch.setattr(src.app, "MODEL_PATH", str(output_dir / "model.pkl"))
+    monkeypatch.setattr(src.app, "FEATURE_PIPELINE_PATH", str(output_dir / "feature_pipeline.pkl"))
+    monkeypatch.setattr(src.app, "COMPACT_ARTIFACTS_DIR", str(output_dir / "compact"))
+    monkeypatch.setattr(src.app, "ARTIFACT_FORMAT", artifact_format)
+
+    with open(INFERENCE_SAMPLE_FILE, "r") as f:
+        sample_data = json.load(f)
+    src.app.load_artifacts.cache_clear()
+    try:
+        churn_model, feature_pipeline = src.app.load_artifacts()
+        assert "tickets_per_tenure_month" in " ".join(feature_pipeline.get_feature_names_out())
+        response = TestClient(src.app.app).post("/predict/batch/", json=sample_data)
+    finally:
+        src.app.load_artifacts.cache_clear()
+
+    assert response.status_code == 200
+    customers = pd.DataFrame([PredictModel.model_validate(customer).model_dump() for customer in sample_data])
+    expected = joblib.load(output_dir / "model.pkl").predict_proba(
+        joblib.load(output_dir / "feature_pipeline.pkl").transform(customers)
+    )[:, 1]
+    np.testing.assert_allclose(response.json()["churn_likelihood"], expected, rtol=1e-6)
+
+
+def test_drift_report_includes_derived_features(tmp_path):
+    monitor_drift("data/churn_ref_sample.csv", "data/churn_shifted_sample.csv", str(tmp_path / "drift.json"))
+    with open(tmp_path / "drift.json", "r") as f:
+        report = json.load(f)
+    assert {definition.name for definition in DERIVED_FEATURES} <= set(report["features"])
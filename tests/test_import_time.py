@@ -0,0 +1,63 @@
+# Cold start budgets for the entry points, measured with `python -X importtime`
+# Run a single report with:
+# python -X importtime -c "import src.app" 2> importtime.log
+
+import subprocess
+import sys
+import pytest
+
+# Cumulative import time budgets in ms (~3x the local measurement, CI runners are slower)
+IMPORT_BUDGETS_MS = {
+    "src.app": 2000,
+    "src.train": 3500,
+    "src.drift": 1200,
+    "src.agent_tools": 500,
+    "src.agent_monitor": 600,
+}
+
+# Heavy modules each entry point must not import eagerly
+FORBIDDEN_IMPORTS = {
+    "src.app": {"sklearn", "shap", "xgboost", "lightgbm", "matplotlib", "scipy"},
+    "src.train": {"shap", "xgboost", "lightgbm", "matplotlib"},
+    "src.drift": {"sklearn", "shap", "xgboost", "lightgbm", "matplotlib", "fastapi"},
+    "src.agent_tools": {"fastapi", "joblib", "pandas", "sklearn", "shap", "xgboost", "lightgbm"},
+    "src.agent_monitor": {"langchain_core", "langchain_openai", "langgraph", "langfuse", "openai", "fastapi", "sklearn"},
+}
+
+
+def measure_import(module: str) -> dict[str, int]:
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+
+    Returns:
+        dict: Cumulative import time (us) for every imported module
+    """
+    report = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    cumulative_us = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative_us[name.strip()] = int(cumulative)
+    return cumulative_us
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_MS))
+def test_entry_point_import_time_within_budget(module):
+    """Each entry point imports only what it uses and stays within its cold start budget"""
+    measure_import(module)  # Warm up bytecode caches
+    cumulative_us = measure_import(module)
+
+    loaded_packages = {name.split(".")[0] for name in cumulative_us}
+    assert not loaded_packages & FORBIDDEN_IMPORTS[module], \
+        f"{module} eagerly imports {loaded_packages & FORBIDDEN_IMPORTS[module]}"
+
+    import_time_ms = cumulative_us[module] / 1000
+    assert import_time_ms <= IMPORT_BUDGETS_MS[module], \
+        f"{module} import takes {import_time_ms:.0f}ms, budget is {IMPORT_BUDGETS_MS[module]}ms"
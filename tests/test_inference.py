@@ -44,4 +44,28 @@ def test_health_check_returns_ok():
     """Test /health endpoint"""
     response = client.get("/health/")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
\ No newline at end of file
+    assert response.json()["status"] == "ok"
+
+def test_any_request_id_is_accepted_and_logged(tmp_path):
+    """Client request ids of any length and encoding (e.g. hyphenated UUIDs) are echoed and logged"""
+    from src.app import get_served_prediction_logger
+    from src.prediction_log import PredictionLogger, read_prediction_log
+
+    logger = PredictionLogger(str(tmp_path / "prediction_log"))
+    app.dependency_overrides[get_served_prediction_logger] = lambda: logger
+    uuid_request_id = "123e4567-e89b-42d3-a456-426614174000"
+    request_ids = []
+    try:
+        for header in (uuid_request_id, "café-42".encode("latin-1")):
+            response = client.post("/predict/", json=sample_data[0], headers={"X-Request-ID": header})
+            assert response.status_code == 200
+            request_ids.append(response.json()["request_id"])
+        assert request_ids[0] == uuid_request_id and request_ids[1].startswith("caf")
+        response = client.post("/predict/batch/", json=sample_data, headers={"X-Request-ID": uuid_request_id})
+        assert response.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_served_prediction_logger)
+
+    assert logger.flush(timeout=10)
+    logger.close()
+    assert list(read_prediction_log(str(tmp_path / "prediction_log"))["request_id"][:2]) == request_ids
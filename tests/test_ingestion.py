@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src.app import app
+from src.io_schemas import PredictModel
+from src.validation import validate_customers
+
+INFERENCE_SAMPLE_FILE = "tests/sample.json"
+
+client = TestClient(app)
+
+with open(INFERENCE_SAMPLE_FILE, "r") as f:
+    sample_data = json.load(f)
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {},
+        {"tenure_months": "20"},  # Coerced by Pydantic
+        {"autopay": None},
+        {"plan_type": "Gold"},
+        {"tenure_months": "twenty", "contract_type": 1},
+        {"downtime_hours_30d": None},
+    ],
+)
+def test_validate_customers_matches_predict_model(changes):
+    """Same accepted values and same errors as PredictModel"""
+    customer = {**sample_data[0], **changes}
+    try:
+        expected = PredictModel.model_validate(customer).model_dump()
+    except ValidationError as e:
+        with pytest.raises(ValidationError) as error:
+            validate_customers(customer)
+        assert error.value.errors() == e.errors()
+        return
+
+    columns = validate_customers(customer)
+    for name, value in expected.items():
+        if value is None and columns[name].dtype == np.float64:
+            assert np.isnan(columns[name][0])
+        else:
+            assert columns[name][0] == value
+
+
+def test_missing_field_and_invalid_json_return_fastapi_errors():
+    customer = {key: value for key, value in sample_data[0].items() if key != "tenure_months"}
+    response = client.post("/predict/", json=customer)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "tenure_months"]
+    assert response.json()["detail"][0]["type"] == "missing"
+
+    response = client.post("/predict/", content=b'{"plan_type": ', headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_predict_batch_matches_single_predictions():
+    response = client.post("/predict/batch/", json=sample_data)
+    assert response.status_code == 200
+    batch = response.json()
+    assert len(batch["request_ids"]) == len(sample_data) == len(set(batch["request_ids"]))
+
+    for i, customer in enumerate(sample_data):
+        single = client.post("/predict/", json=customer).json()
+        assert batch["churn_class"][i] == single["churn_class"]
+        assert batch["churn_likelihood"][i] == pytest.approx(single["churn_likelihood"])
+
+    response = client.post("/predict/batch/", json=[sample_data[0], {**sample_data[0], "plan_type": "Gold"}])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "plan_type"]
+
+
+def test_oversize_batches_are_rejected_before_validation(monkeypatch):
+    """413 as soon as the list is decoded: no customer is validated"""
+    import src.ingestion
+
+    calls = []
+    monkeypatch.setattr(src.ingestion, "validate_customers", lambda *args, **kwargs: calls.append(args))
+    monkeypatch.setattr(src.ingestion, "MAX_BATCH_ROWS", 2)
+    response = client.post("/predict/batch/", json=sample_data[:1] * 3)
+    assert response.status_code == 413
+    assert calls == []
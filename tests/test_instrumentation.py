@@ -0,0 +1,58 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.instrumentation import ServingMetrics
+
+MAX_OBSERVE_OVERHEAD_US = 5  # Instrumentation budget per observation
+
+
+def test_predict_stages_are_exposed_on_metrics_and_health():
+    """/predict/ and /predict/batch/ stage latencies show up as Prometheus histograms and as rolling percentiles"""
+    client = TestClient(app)
+    customer = client.app.openapi()["components"]["schemas"]["PredictModel"]["example"]
+    for _ in range(5):
+        assert client.post("/predict/", json=customer).status_code == 200
+    assert client.post("/predict/", json={**customer, "tenure_months": None}).status_code == 400
+    assert client.post("/predict/batch/", json=[customer] * 3).status_code == 200
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    for route in ("/predict/", "/predict/batch/"):
+        for stage in ("parse_validate", "transform", "predict", "serialize", "request"):
+            assert f'churn_stage_latency_seconds_count{{path="{route}",stage="{stage}"' in metrics.text
+    assert 'churn_errors_total{stage="predict"' in metrics.text
+    assert 'churn_http_requests_total{path="/predict/",status="400"' in metrics.text
+
+    latency = client.get("/health/").json()["latency_ms"]
+    assert latency["/predict/"]["predict"]["count"] >= 5 and latency["/predict/batch/"]["request"]["count"] >= 1
+    predict = latency["/predict/"]["predict"]
+    assert predict["p50_ms"] <= predict["p95_ms"] <= predict["p99_ms"]
+
+
+def test_observe_overhead_is_a_few_microseconds():
+    """Recording a stage latency costs a few microseconds at most"""
+    metrics = ServingMetrics()
+    n_observations = 100_000
+    start = time.perf_counter()
+    for i in range(n_observations):
+        metrics.observe("predict", i * 1e-7)
+    overhead_us = (time.perf_counter() - start) / n_observations * 1e6
+    assert overhead_us < MAX_OBSERVE_OVERHEAD_US, f"observe() takes {overhead_us:.2f}us"
+    assert metrics.summary()["/predict/"]["predict"]["count"] == metrics.window
+
+
+def test_request_counters_have_bounded_and_escaped_labels():
+    """Unmatched paths share the "other" label and label values are escaped"""
+    client = TestClient(app)
+    for path in ("/wp-admin/1", "/wp-admin/2", '/a"b\\c'):
+        assert client.get(path).status_code == 404
+    text = client.get("/metrics").text
+    assert 'churn_http_requests_total{path="other",status="404"' in text
+    assert "wp-admin" not in text
+
+    metrics = ServingMetrics()
+    metrics.increment("errors_total", stage='pre"dict\\\n')
+    assert 'churn_errors_total{stage="pre\\"dict\\\\\\n",model_version="v\\"1"} 1' in metrics.render_prometheus('v"1')
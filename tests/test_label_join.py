@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.label_join import join_labels
+from src.prediction_log import PredictionLogger, read_prediction_log
+
+HOUR = 3600
+START = 1_780_000_000 // HOUR * HOUR  # Some hour in 2026 (UTC)
+N_PER_HOUR = 200
+
+
+def test_label_join_appends_only_new_closed_hours(tmp_path):
+    """
+    Logged predictions joined with late labels become hourly metrics_history points,
+    hours are appended once and only after the label delay
+    """
+    rng = np.random.default_rng(0)
+    logger = PredictionLogger(str(tmp_path / "prediction_log"), model_version="abc", segment_rows=128)
+    labels = []
+    for hour in range(3):
+        for i in range(N_PER_HOUR):
+            request_id = f"{hour}-{i}"
+            churned = int(rng.integers(0, 2))
+            churn_likelihood = float(np.clip(0.5 * churned + rng.normal(0.25, 0.2), 0, 1))
+            error = i % 50 == 0
+            logger.log(request_id, START + hour * HOUR + i, churn_likelihood, int(churn_likelihood > 0.5), 100.0 + i, error)
+            labels.append({"request_id": request_id, "churned": churned})
+    logger.close()
+
+    assert len(read_prediction_log(str(tmp_path / "prediction_log"))) == 3 * N_PER_HOUR
+
+    labels_path = tmp_path / "labels.csv"
+    pd.DataFrame(labels).to_csv(labels_path, index=False)
+    metrics_path = tmp_path / "metrics_history.jsonl"
+    metrics_path.write_text(json.dumps({"ts": "2020-01-01T00:32:20.895592", "roc_auc": 0.9}) + "\n")
+
+    # Hours 0 and 1 are closed 24h later, hour 2 is still waiting for labels
+    now = START + 2 * HOUR + 24 * HOUR + 10
+    points = join_labels(str(tmp_path / "prediction_log"), str(labels_path), str(metrics_path), now=now)
+    assert [point["n_predictions"] for point in points] == [N_PER_HOUR, N_PER_HOUR]
+    assert points[0]["error_rate"] == N_PER_HOUR // 50 / N_PER_HOUR
+    assert points[0]["roc_auc"] > 0.8 and 0 < points[0]["pr_auc"] <= 1 and 0 < points[0]["acc"] <= 1
+    assert points[0]["latency_p95_ms"] == int(round(np.percentile(100.0 + np.arange(N_PER_HOUR), 95)))
+
+    # Incremental: a second run only adds the newly closed hour
+    points = join_labels(str(tmp_path / "prediction_log"), str(labels_path), str(metrics_path), now=now + HOUR)
+    assert len(points) == 1
+    assert join_labels(str(tmp_path / "prediction_log"), str(labels_path), str(metrics_path), now=now + HOUR) == []
+
+    history = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert len(history) == 4
+    assert [point["ts"] for point in history[1:]] == sorted(point["ts"] for point in history[1:])
+
+
+def test_prediction_log_writer_survives_write_errors(tmp_path, monkeypatch):
+    """A failed segment drops its rows only: flush() returns and the next segments are written"""
+    logger = PredictionLogger(str(tmp_path / "prediction_log"), segment_rows=2)
+    write_segment = logger._write_segment
+    calls = []
+
+    def failing_write_segment(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise OSError("No space left on device")
+        write_segment(rows)
+
+    monkeypatch.setattr(logger, "_write_segment", failing_write_segment)
+    for i in range(4):
+        logger.log(f"req-{i}-ü" * 10, START + i, 0.5, 0, 10.0)
+    assert logger.flush(timeout=10)
+    logger.close()
+
+    request_ids = read_prediction_log(str(tmp_path / "prediction_log"))["request_id"]
+    assert list(request_ids) == [f"req-{i}-ü" * 10 for i in (2, 3)]
+
+
+def test_hours_without_labels_are_skipped(tmp_path):
+    """metrics_history only gets numeric quality metrics: hours without labeled rows are left out"""
+    logger = PredictionLogger(str(tmp_path / "prediction_log"), model_version="abc")
+    labels = []
+    for hour in range(3):
+        for i in range(20):
+            logger.log(f"{hour}-{i}", START + hour * HOUR + i, i / 20, int(i >= 10), 100.0, False)
+            if hour != 1:
+                labels.append({"request_id": f"{hour}-{i}", "churned": int(i >= 8)})
+    logger.close()
+    pd.DataFrame(labels).to_csv(tmp_path / "labels.csv", index=False)
+
+    metrics_path = tmp_path / "metrics_history.jsonl"
+    now = START + 3 * HOUR + 24 * HOUR
+    points = join_labels(str(tmp_path / "prediction_log"), str(tmp_path / "labels.csv"), str(metrics_path), now=now)
+
+    assert [point["n_labeled"] for point in points] == [20, 20]
+    history = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert all(isinstance(point[name], float) for point in history for name in ("roc_auc", "pr_auc", "acc"))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import (
+    accuracy_score,
+    average_precision_score,
+    brier_score_loss,
+    log_loss,
+    roc_auc_score,
+)
+
+from src.metrics import compute_classification_metrics
+
+N_SAMPLES = 5_000
+CURVE_POINTS = 21
+
+
+@pytest.fixture
+def predictions():
+    rng = np.random.default_rng(42)
+    y_true = rng.integers(0, 2, N_SAMPLES)
+    # Rounded scores create ties, the hard case for a single sorted pass
+    y_score = np.clip(0.3 * y_true + rng.normal(0.35, 0.2, N_SAMPLES), 0, 1).round(2)
+    slices = pd.DataFrame({"plan_type": rng.choice(["Basic", "Standard", "Pro"], N_SAMPLES)})
+    return y_true, y_score, slices
+
+
+def test_metrics_match_sklearn(predictions):
+    """Single pass metrics are equal to the sklearn reference implementations"""
+    y_true, y_score, _ = predictions
+    metrics = compute_classification_metrics(y_true, y_score, curve_points=CURVE_POINTS)
+
+    assert metrics["roc_auc"] == pytest.approx(roc_auc_score(y_true, y_score))
+    assert metrics["pr_auc"] == pytest.approx(average_precision_score(y_true, y_score))
+    assert metrics["log_loss"] == pytest.approx(log_loss(y_true, y_score))
+    assert metrics["brier"] == pytest.approx(brier_score_loss(y_true, y_score))
+    assert metrics["acc"] == pytest.approx(accuracy_score(y_true, y_score > 0.5))
+
+    # Curves are downsampled, calibration bins cover every sample
+    assert len(metrics["roc_curve"]["fpr"]) <= CURVE_POINTS
+    assert len(metrics["pr_curve"]["precision"]) <= CURVE_POINTS
+    assert sum(metrics["calibration"]["count"]) == N_SAMPLES
+
+
+def test_sliced_metrics_match_metrics_on_the_slice(predictions):
+    """Metrics of a slice are the metrics computed on the slice rows alone"""
+    y_true, y_score, slices = predictions
+    sliced = compute_classification_metrics(y_true, y_score, slices=slices)["slices"]["plan_type"]
+
+    assert set(sliced) == {"Basic", "Standard", "Pro"}
+    for category, slice_metrics in sliced.items():
+        mask = (slices["plan_type"] == category).to_numpy()
+        assert slice_metrics["n_samples"] == mask.sum()
+        assert slice_metrics["roc_auc"] == pytest.approx(roc_auc_score(y_true[mask], y_score[mask]))
+        assert slice_metrics["pr_auc"] == pytest.approx(average_precision_score(y_true[mask], y_score[mask]))
+
+
+def test_single_class_has_no_ranking_metrics():
+    """ROC-AUC and PR-AUC are undefined (None) when only one class is present"""
+    metrics = compute_classification_metrics([1, 1, 1], [0.9, 0.4, 0.7])
+    assert metrics["roc_auc"] is None and metrics["pr_auc"] is None
+    assert metrics["acc"] == pytest.approx(2 / 3)
@@ -0,0 +1,45 @@
+import json
+import tracemalloc
+
+import numpy as np
+
+from src.profiling import StageProfiler
+
+
+def test_profiler_records_time_and_memory_per_stage(tmp_path):
+    """Each stage gets wall/CPU time and peak memory, dumps are written when requested"""
+    profiler = StageProfiler(trace_memory=True, dump_dir=str(tmp_path / "profile"))
+    with profiler.stage("allocate"):
+        array = np.ones(2**21)  # 16 MiB
+    with profiler.stage("compute"):
+        float(np.sort(array).sum())
+
+    profiler.save(str(tmp_path / "training_profile.json"))
+    report = json.loads((tmp_path / "training_profile.json").read_text())
+
+    assert list(report["stages"]) == ["allocate", "compute"]
+    allocate = report["stages"]["allocate"]
+    assert allocate["peak_memory_mb"] >= 16
+    assert allocate["wall_s"] >= 0 and allocate["cpu_s"] >= 0
+    assert (tmp_path / "profile" / "allocate.prof").is_file()
+    assert report["total"]["wall_s"] == sum(stage["wall_s"] for stage in report["stages"].values())
+
+
+def test_profiler_times_stages_without_tracing_memory_by_default():
+    """Plain profiling leaves tracemalloc off (no inflated timings) and records RSS growth per stage"""
+    profiler = StageProfiler()
+    with profiler.stage("allocate"):
+        assert not tracemalloc.is_tracing()
+        array = np.ones(2**23)  # 64 MiB (always mmapped: fresh pages), pages touched
+    record = profiler.report()["stages"]["allocate"]
+    assert "peak_memory_mb" not in record
+    assert record["rss_delta_mb"] >= 60
+    assert record["process_max_rss_mb"] >= record["max_rss_increase_mb"] >= 0
+    del array
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StageProfiler(enabled=False)
+    with profiler.stage("split_data"):
+        pass
+    assert profiler.report()["stages"] == {}
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app import load_artifacts
+from src.score import score_file
+from src.validation import validate_frame
+
+DATA_PATH = "data/customer_churn_synth.csv"
+OUTPUT_VAR = "churned"
+
+
+@pytest.fixture(scope="module")
+def customers():
+    customers = pd.read_csv(DATA_PATH).drop(columns=OUTPUT_VAR).head(500)
+    customers.insert(0, "customer_id", [f"c{i}" for i in range(len(customers))])
+    return customers
+
+
+def test_validate_frame_flags_invalid_rows(customers):
+    """PredictModel rules, one column at a time: bad rows are flagged, the others kept"""
+    chunk = customers.head(4).drop(columns="downtime_hours_30d").astype({"tenure_months": object})
+    chunk.loc[1, "plan_type"] = "Gold"
+    chunk.loc[2, "tenure_months"] = "twenty"
+    chunk.loc[3, "autopay"] = None  # Optional in PredictModel
+
+    columns, errors = validate_frame(chunk)
+
+    assert errors[0] == "" and errors[3] == ""
+    assert errors[1].startswith("plan_type")
+    assert errors[2].startswith("tenure_months")
+    assert (columns["downtime_hours_30d"] == 0.0).all()  # PredictModel default
+    with pytest.raises(ValueError, match="plan_type"):
+        validate_frame(customers.drop(columns="plan_type"))
+
+
+@pytest.mark.parametrize("workers,output_name", [(0, "scores.csv"), (2, "scores.parquet")])
+def test_score_file_matches_the_served_model(tmp_path, customers, workers, output_name):
+    """Chunked (and parallel) scoring gives the /predict/ outputs, in input order"""
+    customers = customers.copy()
+    customers.loc[7, "contract_type"] = "Weekly"
+    customers.to_csv(tmp_path / "customers.csv", index=False)
+
+    stats = score_file(
+        str(tmp_path / "customers.csv"),
+        str(tmp_path / output_name),
+        chunk_rows=64,
+        workers=workers,
+        id_columns=("customer_id",),
+    )
+    output_path = str(tmp_path / output_name)
+    scores = pd.read_parquet(output_path) if output_name.endswith(".parquet") else pd.read_csv(output_path).fillna({"error": ""})
+
+    assert stats["rows"] == len(customers) and stats["invalid_rows"] == 1
+    assert list(scores["customer_id"]) == list(customers["customer_id"])
+    assert scores.loc[7, "churn_class"] == -1 and scores.loc[7, "error"].startswith("contract_type")
+
+    churn_model, feature_pipeline = load_artifacts()
+    valid = scores["churn_class"] != -1
+    features = feature_pipeline.transform(customers[valid.to_numpy()])
+    np.testing.assert_allclose(scores.loc[valid, "churn_likelihood"], churn_model.predict_proba(features)[:, 1], rtol=1e-6)
+    np.testing.assert_array_equal(scores.loc[valid, "churn_class"], churn_model.predict(features))
+    assert scores["model_version"].nunique() == 1
+
+
+@pytest.mark.parametrize("input_name,output_name", [("customers.csv", "scores.csv"), ("customers.parquet", "scores.parquet")])
+def test_score_file_writes_the_header_for_empty_inputs(tmp_path, customers, input_name, output_name):
+    """An input without rows still gives a scores file, with its columns and no rows"""
+    empty = customers.head(0)
+    empty.to_parquet(tmp_path / input_name) if input_name.endswith(".parquet") else empty.to_csv(tmp_path / input_name, index=False)
+
+    stats = score_file(str(tmp_path / input_name), str(tmp_path / output_name), workers=0, id_columns=("customer_id",))
+    output_path = str(tmp_path / output_name)
+    scores = pd.read_parquet(output_path) if output_name.endswith(".parquet") else pd.read_csv(output_path)
+
+    assert stats["rows"] == 0 and len(scores) == 0
+    assert list(scores.columns) == ["customer_id", "row", "churn_likelihood", "churn_class", "error", "model_version"]
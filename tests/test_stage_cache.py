@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+
+import src.stage_cache
+from src.stage_cache import MISSING, StageCache, compute_stage_key
+from src.train import train
+
+DATA_PATH = "data/customer_churn_synth.csv"
+CODE_VERSION = {"git_sha": "abc", "source_sha256": "def"}
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+        self.values = None
+
+    def fit(self):
+        self.calls += 1
+        self.values = np.arange(1000, dtype=np.float64)
+
+
+def test_stage_key_depends_on_data_config_and_code(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("a,b\n1,2\n")
+    key = compute_stage_key(str(data), {"model": "lr"}, CODE_VERSION)
+
+    assert key == compute_stage_key(str(data), {"model": "lr"}, CODE_VERSION)
+    assert key != compute_stage_key(str(data), {"model": "rf"}, CODE_VERSION)
+    assert key != compute_stage_key(str(data), {"model": "lr"}, {**CODE_VERSION, "git_sha": "xyz"})
+    data.write_text("a,b\n1,3\n")
+    assert key != compute_stage_key(str(data), {"model": "lr"}, CODE_VERSION)
+
+
+def test_run_restores_stages_and_evicts_by_size(tmp_path):
+    cache = StageCache("key", path=str(tmp_path))
+    owner = Counter()
+    assert not cache.run("fit", owner, ("values",))
+
+    restored = Counter()
+    assert cache.run("fit", restored, ("values",))
+    assert restored.calls == 0
+    np.testing.assert_array_equal(restored.values, owner.values)
+    assert cache.stats() == {"hits": ["fit"], "misses": ["fit"]}
+
+    # Corrupted entries are dropped and recomputed
+    cache.entry_path("fit").write_bytes(b"not a pickle")
+    assert cache.get("fit") is MISSING
+    assert not cache.entry_path("fit").exists()
+
+    # Least recently used entries go first when the cache exceeds max_bytes
+    small_cache = StageCache("other", path=str(tmp_path), max_bytes=10_000)
+    small_cache.put("a", np.zeros(500))
+    os.utime(small_cache.entry_path("a"), (0, 0))
+    small_cache.put("b", np.zeros(500))
+    small_cache.put("c", np.zeros(500))
+    assert not small_cache.entry_path("a").exists()
+    assert small_cache.entry_path("c").exists()
+
+
+def test_train_restores_cached_stages(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(src.stage_cache, "STAGE_CACHE_DIR", str(tmp_path / "cache"))
+    output_dir = tmp_path / "artifacts"
+    output_dir.mkdir()
+
+    train(DATA_PATH, str(output_dir))
+    metrics = (output_dir / "metrics.json").read_text()
+    os.remove(output_dir / "model.pkl")
+    assert "restored" not in capsys.readouterr().out
+
+    train(DATA_PATH, str(output_dir), profile=True)
+    assert "split_data, cross_validate, train, compute_shap_values" in capsys.readouterr().out
+    profile = json.loads((output_dir / "training_profile.json").read_text())
+    assert profile["stages"]["train"]["cache_hit"] and not profile["stages"]["save_model"]["cache_hit"]
+    assert os.path.isfile(output_dir / "model.pkl")  # Artifacts are written on cache hits too
+    assert (output_dir / "metrics.json").read_text().split('"timestamp"')[0] == metrics.split('"timestamp"')[0]
+
+    train(DATA_PATH, str(output_dir), use_cache=False)
+    assert "restored" not in capsys.readouterr().out
@@ -7,6 +7,8 @@ import os
 import json
 from datetime import datetime, timedelta
 
+import pandas as pd
+
 DATA_PATH = "data/customer_churn_synth.csv"  # Input dataset
 ROC_AUC_QUALITY_THRESHOLD = 0.83
 ARTIFACTS_DIR = "artifacts/"  # Output directory for artifacts
@@ -51,3 +53,19 @@ def test_train_produces_artifacts_and_quality():
     model_roc_auc = model_metrics["roc_auc"]
     assert model_roc_auc >= ROC_AUC_QUALITY_THRESHOLD, \
         f"ROC-AUC {model_roc_auc} is below threshold {ROC_AUC_QUALITY_THRESHOLD}"
+
+
+def test_train_with_cross_validation(tmp_path):
+    """CV mode: out-of-fold metrics, mean/std per fold and a final model fit on all rows"""
+    train(DATA_PATH, str(tmp_path), cv_folds=3)
+
+    with open(tmp_path / "metrics.json", "r") as file:
+        model_metrics = json.load(file)
+
+    cv = model_metrics["cv"]
+    assert cv["folds"] == len(cv["per_fold"]) == 3
+    assert cv["mean"]["roc_auc"] >= ROC_AUC_QUALITY_THRESHOLD
+    assert 0 <= cv["std"]["roc_auc"] < 0.05
+    assert model_metrics["roc_auc"] >= ROC_AUC_QUALITY_THRESHOLD  # Out-of-fold, over every row
+    assert os.path.isfile(tmp_path / "model.pkl")
+    assert len(pd.read_csv(tmp_path / "feature_importances.csv")) == 100  # SHAP on a sample of all rows